@@ -1,10 +1,18 @@
 #!/usr/bin/env python3
-import os, re, sys, json, time, signal, shutil, threading, subprocess, hashlib
+import os, re, sys, json, array, time, signal, shutil, select, platform, threading, subprocess, hashlib
 from datetime import datetime
 from pathlib import Path
 
 import requests
 import psutil
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import numpy as np
+except ImportError:
+    np = None
 try:
     import build_bench_report as report_builder
 except Exception:
@@ -45,20 +53,65 @@ USE_ASITOP_CSV = False                       # set True if you installed asitop-
 POWERMETRICS_INTERVAL_MS = 1000              # sample every 1s
 GEN_TIMEOUT_SECONDS = 300                    # interrupt generation after ~3m20s
 GEN_TIMER_INTERVAL_SECONDS = 2               # print timer update every 2s
+POWERMETRICS_SLACK_SECONDS = 60              # extra sampling budget beyond GEN_TIMEOUT_SECONDS
+CACHE_DIR      = Path.home() / ".cache" / "lmtestauto"
+CACHE_DISABLED = os.environ.get("LMTA_DISABLE_CACHE") == "1"
+SAMPLER_CACHE_TTL_SECONDS = 86400            # detected powermetrics samplers only change with the OS
+MODELS_CACHE_TTL_SECONDS = 300               # model list goes stale once new models are downloaded
 # ---------------------------
 
 def get_out_dir():
     # Create a hash of the settings
     settings_str = f"{PROMPT}{MAX_TOKENS}{TEMP}{TOP_P}{NUM_CTX}{REASONING_EFFORT}{GPU_SETTING}"
-    settings_hash = hashlib.sha256(settings_str.encode('utf-8')).hexdigest()[:10]
+    settings_hash = hashlib.sha256(settings_str.encode('utf-8'), usedforsecurity=False).hexdigest()[:10]
     return Path("reports") / f"lmstudio-bench-{settings_hash}"
 
 OUT_DIR = get_out_dir()
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Keep-alive connection to the local server, reused by health probes and chat requests
+SESSION = requests.Session()
+
+def _cache_key(*parts):
+    return hashlib.sha256("|".join(map(str, parts)).encode("utf-8"), usedforsecurity=False).hexdigest()[:16]
+
+def cache_get(name, ttl):
+    """Return the cached value for name if it is younger than ttl seconds, else None."""
+    if CACHE_DISABLED:
+        return None
+    try:
+        entry = json.loads((CACHE_DIR / f"{name}.json").read_text())
+        if time.time() - entry["ts"] < ttl:
+            return entry["value"]
+    except Exception:
+        pass
+    return None
+
+def cache_put(name, value):
+    if CACHE_DISABLED:
+        return
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        (CACHE_DIR / f"{name}.json").write_text(json.dumps({"ts": time.time(), "value": value}))
+    except Exception:
+        pass
+
+def json_bytes(obj):
+    """Pretty-printed JSON as UTF-8 bytes; uses orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass  # e.g. ints beyond 64 bit; let the stdlib handle it
+    return json.dumps(obj, indent=2).encode("utf-8")
+
 def run(cmd, check=True, capture_output=True, text=True):
     return subprocess.run(cmd, check=check, capture_output=capture_output, text=text)
 
+def run_quiet(cmd):
+    # fire-and-forget: no pipes, no decoding, exit code is the only result
+    return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False).returncode
+
 def assert_cli_tools():
     if not shutil.which("lms"):
         raise RuntimeError(
@@ -72,24 +125,21 @@ def assert_cli_tools():
 
 def ensure_server():
     # start the local API server if not already running
-    try:
-        run(["lms", "server", "status"])
-    except Exception:
-        pass
-    try:
-        run(["lms", "server", "start"])
-    except subprocess.CalledProcessError as e:
-        # if it's already running, lms might non-zero; we’ll probe HTTP below
-        pass
-    # wait for REST to respond
-    for _ in range(60):
+    run_quiet(["lms", "server", "status"])
+    # if it's already running, lms might non-zero; we’ll probe HTTP below
+    run_quiet(["lms", "server", "start"])
+    # wait for REST to respond: exponential backoff from 50ms, capped at 2s per wait, ~30s overall
+    delay = 0.05
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
         try:
-            r = requests.get(f"{REST_BASE}/models", timeout=1.5)
+            r = SESSION.get(f"{REST_BASE}/models", timeout=1.5)
             if r.ok:
                 return
         except Exception:
             pass
-        time.sleep(0.5)
+        time.sleep(delay)
+        delay = min(delay * 1.3, 2.0)
     raise RuntimeError("LM Studio server didn't come up at http://127.0.0.1:1234")
 
 def _norm_key(s: str) -> str:
@@ -100,10 +150,14 @@ def _norm_key(s: str) -> str:
 
 
 def list_models():
+    cache_name = f"models-{_cache_key(API_BASE)}"
+    cached = cache_get(cache_name, MODELS_CACHE_TTL_SECONDS)
+    if cached:
+        return cached
     # Gather REST API ids (for chat) and CLI keys (for lms load)
     rest_ids = []
     try:
-        r = requests.get(f"{REST_BASE}/models", timeout=5)
+        r = SESSION.get(f"{REST_BASE}/models", timeout=5)
         r.raise_for_status()
         data = r.json()
         rest_ids = [m.get("id") for m in data.get("data", []) if m.get("type") == "llm" and m.get("id")]
@@ -146,13 +200,12 @@ def list_models():
         for row in cli_rows:
             cli_key = row["cli_key"]
             results.append({"api_id": row.get("name") or cli_key, "cli_key": cli_key, "display": row.get("name") or cli_key})
+    if results:
+        cache_put(cache_name, results)
     return results
 
 def unload_all():
-    try:
-        run(["lms", "unload", "--all"])
-    except subprocess.CalledProcessError:
-        pass
+    run_quiet(["lms", "unload", "--all"])
 
 def load_model(model_id):
     t0 = time.perf_counter()
@@ -194,14 +247,73 @@ def load_with_fallbacks(api_id: str, cli_key: str):
     raise last_exc or RuntimeError(f"Failed to load model for {api_id}")
 
 ansi_escape = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+# powermetrics line patterns, compiled once and shared by every parse
+POWER_RE = re.compile(r"(CPU|GPU|ANE).*?Power:\s*([\d.]+)\s*(m?W)", re.I)
+AVG_RE = re.compile(r"Average power:\s*([\d.]+)\s*(m?W)", re.I)
+SECTION_RE = re.compile(r"^(CPU|GPU|ANE)\b", re.I)
+SAMPLE_DELIMITER = "*** Sampled system activity"  # first line of every powermetrics sample
+# Model output -> HTML extraction
+THINK_RE = re.compile(r"<think[\s\S]*?</think>", re.I)
+HTML_RE = re.compile(r"<html[\s\S]*?</html>", re.I)
+FENCE_RE = re.compile(r"```(?:html)?\s*([\s\S]*?)```", re.I)
+EXTRACT_MAX_CHARS = 1_000_000  # answers beyond this are runaway generations; don't regex-scan all of it
+
+def _to_watts(val, unit):
+    return float(val) / 1000.0 if unit.lower() == "mw" else float(val)
+
+class PowerLogParser:
+    """Incremental CPU/GPU/ANE power (W) extractor for powermetrics output lines."""
+    def __init__(self):
+        self.cpu_watts, self.gpu_watts, self.ane_watts = array.array("d"), array.array("d"), array.array("d")
+        self._by_label = {"CPU": self.cpu_watts, "GPU": self.gpu_watts, "ANE": self.ane_watts}
+        self._section = None
+
+    def feed(self, line):
+        s = line.strip()
+        if "\x1b" in s:
+            s = ansi_escape.sub("", s)
+        # Track current section if lines start with CPU/GPU/ANE
+        msec = SECTION_RE.match(s)
+        if msec:
+            self._section = msec.group(1).upper()
+        # Direct power lines e.g., "CPU Power: 12.3 W" or "GPU Power: 800 mW"
+        m = POWER_RE.search(s)
+        if m:
+            self._by_label[m.group(1).upper()].append(_to_watts(m.group(2), m.group(3)))
+            return
+        # Average power lines within a section e.g., "Average power: 850 mW"
+        m = AVG_RE.search(s)
+        if m and self._section:
+            self._by_label[self._section].append(_to_watts(m.group(1), m.group(2)))
+
+    def stats(self):
+        def stats(arr):
+            if not arr:
+                return {"avg": None, "max": None, "min": None, "samples": 0}
+            if np is not None:
+                a = np.frombuffer(arr, dtype=np.float64)
+                return {"avg": float(a.mean()), "max": float(a.max()), "min": float(a.min()), "samples": len(a)}
+            return {"avg": sum(arr) / len(arr), "max": max(arr), "min": min(arr), "samples": len(arr)}
+        return {"cpu_watts": stats(self.cpu_watts), "gpu_watts": stats(self.gpu_watts), "ane_watts": stats(self.ane_watts)}
 
 class PowerSampler:
-    def __init__(self, out_path, sampler_combo=None, interval_ms=1000):
+    """Runs powermetrics and parses its stdout on a reader thread while it runs.
+
+    The raw output is still teed to ``out_path`` so the log stays available for debugging.
+    If a RamTracker is given, the same thread samples it at every powermetrics sample
+    boundary (or on a timer when powermetrics is unavailable or stalls), so no second sampler
+    thread is needed.
+    """
+    def __init__(self, out_path, sampler_combo=None, interval_ms=1000, ram=None, max_samples=None):
         self.out_path = out_path
+        self.max_samples = max_samples
         self.proc = None
         self.stop_evt = threading.Event()
         self.sampler_combo = sampler_combo
         self.interval_ms = interval_ms
+        self.parser = PowerLogParser()
+        self.ram = ram
+        self._reader = None
 
     def start(self):
         if USE_ASITOP_CSV and shutil.which("asitop_csv_logger"):
@@ -210,66 +322,90 @@ class PowerSampler:
             cmd = ["asitop_csv_logger", "--interval", "1"]
         else:
             # Robust default: use powermetrics directly (needs sudo)
-            # We don't set -n; we kill it after generation ends.
+            # We still stop it after generation ends; -n only bounds the log if we never get there.
             sampler = self.sampler_combo or "all"
             cmd = ["powermetrics", "--samplers", sampler, "-i", str(self.interval_ms)]
+            if self.max_samples:
+                cmd += ["-n", str(self.max_samples)]
             if os.name == "posix" and sys.platform == "darwin" and os.geteuid() != 0:
                 print("Warning: powermetrics likely needs sudo; power stats may be empty.", file=sys.stderr)
-        self.proc = subprocess.Popen(
-            cmd, stdout=open(self.out_path, "w"), stderr=subprocess.STDOUT, text=True
-        )
+        try:
+            self.proc = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+            )
+        except OSError as e:
+            print(f"Warning: could not start {cmd[0]}: {e}", file=sys.stderr)
+            self.proc = None
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+
+    def _lines(self, timeout):
+        # Output lines as they arrive, and None whenever nothing came for `timeout` seconds
+        fd = self.proc.stdout.fileno()
+        pending = b""
+        while True:
+            if not select.select([fd], [], [], timeout)[0]:
+                yield None
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            *lines, pending = (pending + chunk).split(b"\n")
+            for raw in lines:
+                yield raw.decode("utf-8", "ignore") + "\n"
+        if pending:
+            yield pending.decode("utf-8", "ignore")
+
+    def _read_output(self):
+        interval = self.interval_ms / 1000.0
+        if self.ram:
+            self.ram.sample()
+        if self.proc:
+            last_tick = time.monotonic()
+            with open(self.out_path, "w", buffering=1) as log:  # line-buffered: the log is current while sampling
+                # Waits at most 2 intervals for output, so RAM is still sampled while powermetrics stalls
+                for line in self._lines(2 * interval):
+                    if line is not None:
+                        log.write(line)
+                        self.parser.feed(line)
+                    if self.ram and ((line is not None and line.startswith(SAMPLE_DELIMITER))
+                                     or time.monotonic() - last_tick >= 2 * interval):
+                        self.ram.sample()
+                        last_tick = time.monotonic()
+        # Sampler exited early (no permission, not installed): keep RAM sampling on a timer
+        if self.ram:
+            while not self.stop_evt.wait(interval):
+                self.ram.sample()
 
     def stop(self):
+        self.stop_evt.set()
         if self.proc:
             try:
-                self.proc.terminate()
+                # powermetrics flushes and exits cleanly on SIGINT; escalate only if it hangs
+                self.proc.send_signal(signal.SIGINT)
                 try:
-                    self.proc.wait(timeout=3)
+                    self.proc.wait(timeout=1)
                 except subprocess.TimeoutExpired:
-                    self.proc.kill()
+                    self.proc.terminate()
+                    try:
+                        self.proc.wait(timeout=2)
+                    except subprocess.TimeoutExpired:
+                        self.proc.kill()
             except Exception:
                 pass
+        if self._reader:
+            self._reader.join(timeout=3)
 
-def parse_powermetrics_log(path):
-    # Extract CPU/GPU/ANE power numbers (W) from powermetrics dumps.
-    cpu_watts, gpu_watts, ane_watts = [], [], []
-    current_section = None
-    with open(path, "r", errors="ignore") as f:
-        for line in f:
-            s = ansi_escape.sub("", line.strip())
-            # Track current section if lines start with CPU/GPU/ANE
-            msec = re.match(r"^(CPU|GPU|ANE)\b", s, re.I)
-            if msec:
-                current_section = msec.group(1).upper()
-            # Direct power lines e.g., "CPU Power: 12.3 W" or "GPU Power: 800 mW"
-            for label, arr in (("CPU", cpu_watts), ("GPU", gpu_watts), ("ANE", ane_watts)):
-                m = re.search(fr"{label}.*?Power:\s*([\d.]+)\s*(m?W)", s, re.I)
-                if m:
-                    val = float(m.group(1))
-                    unit = m.group(2).lower()
-                    arr.append(val / 1000.0 if unit == "mw" else val)
-            # Average power lines within a section e.g., "Average power: 850 mW"
-            m2 = re.search(r"Average power:\s*([\d.]+)\s*(m?W)", s, re.I)
-            if m2 and current_section:
-                val = float(m2.group(1))
-                unit = m2.group(2).lower()
-                watts = val / 1000.0 if unit == "mw" else val
-                if current_section == "CPU":
-                    cpu_watts.append(watts)
-                elif current_section == "GPU":
-                    gpu_watts.append(watts)
-                elif current_section == "ANE":
-                    ane_watts.append(watts)
-    def stats(arr):
-        return {
-            "avg": (sum(arr)/len(arr)) if arr else None,
-            "max": max(arr) if arr else None,
-            "min": min(arr) if arr else None,
-            "samples": len(arr),
-        }
-    return {"cpu_watts": stats(cpu_watts), "gpu_watts": stats(gpu_watts), "ane_watts": stats(ane_watts)}
+    def power_stats(self):
+        """Stats for everything read so far; call after stop()."""
+        return self.parser.stats()
 
 def detect_powermetrics_samplers(samples=3, interval_ms=500):
+    # The working combo depends only on the OS build, so skip the probe runs when it is cached
+    cache_name = f"samplers-{_cache_key(platform.mac_ver()[0], os.uname().release)}"
+    cached = cache_get(cache_name, SAMPLER_CACHE_TTL_SECONDS)
+    if cached:
+        return cached
     combos = [
         "cpu_power,gpu_power,ane_power",
         "cpu_power,gpu_power",
@@ -284,6 +420,7 @@ def detect_powermetrics_samplers(samples=3, interval_ms=500):
         try:
             res = subprocess.run(cmd, check=True, capture_output=True, text=True)
             if res.stdout.strip():
+                cache_put(cache_name, combo)
                 return combo
         except subprocess.CalledProcessError as e:
             last_err = e
@@ -291,57 +428,105 @@ def detect_powermetrics_samplers(samples=3, interval_ms=500):
         print("powermetrics detection failed:", last_err, file=sys.stderr)
     return None
 
-def sample_ram_hwm(stop_evt, interval=1.0):
-    # Track system used memory and LM Studio process RSS HWM while generating
-    sys_hwm = 0
-    lmstudio_hwm = 0
-    while not stop_evt.is_set():
+def _is_lmstudio_proc(info):
+    name = (info.get("name") or "").lower()
+    cmd  = " ".join(info.get("cmdline") or []).lower()
+    return "lm studio" in name or "lmstudio" in cmd or "lms " in cmd
+
+def find_lmstudio_procs():
+    # Full process table scan; callers cache the result between samples.
+    return [p for p in psutil.process_iter(["name", "cmdline"]) if _is_lmstudio_proc(p.info)]
+
+def rss_total(procs):
+    """Sum RSS over cached processes. The flag turns False once any of them has exited."""
+    total, alive = 0, True
+    for p in procs:
+        try:
+            total += p.memory_info().rss
+        except psutil.NoSuchProcess:
+            alive = False
+        except psutil.Error:
+            pass
+    return total, alive
+
+RAM_RESCAN_EVERY = 10                        # re-discover processes every N samples to catch new workers
+
+class RamTracker:
+    """System-used memory and LM Studio RSS high-water marks.
+
+    ``sample()`` is driven by PowerSampler's reader thread, once per powermetrics sample.
+    """
+    def __init__(self):
+        self.sys_hwm = 0
+        self.lmstudio_hwm = 0
+        self._procs = None
+        self._ticks = 0
+
+    def sample(self):
+        if self._procs is None:
+            self._procs = find_lmstudio_procs()
         vm = psutil.virtual_memory()
-        sys_used = vm.total - vm.available
-        sys_hwm = max(sys_hwm, sys_used)
-        rss_sum = 0
-        for p in psutil.process_iter(["name", "cmdline", "memory_info"]):
-            name = (p.info.get("name") or "").lower()
-            cmd  = " ".join(p.info.get("cmdline") or []).lower()
-            if "lm studio" in name or "lmstudio" in cmd or "lms " in cmd:
-                try:
-                    rss_sum += p.info["memory_info"].rss
-                except Exception:
-                    pass
-        lmstudio_hwm = max(lmstudio_hwm, rss_sum)
-        time.sleep(interval)
-    return sys_hwm, lmstudio_hwm
+        self.sys_hwm = max(self.sys_hwm, vm.total - vm.available)
+        rss_sum, alive = rss_total(self._procs)
+        self.lmstudio_hwm = max(self.lmstudio_hwm, rss_sum)
+        self._ticks += 1
+        if not alive or self._ticks % RAM_RESCAN_EVERY == 0:
+            self._procs = find_lmstudio_procs()
+
+    def results(self):
+        return {"system_used_hwm_bytes": self.sys_hwm, "lmstudio_rss_hwm_bytes": self.lmstudio_hwm}
 
 def snapshot_memory():
     vm = psutil.virtual_memory()
     sys_used = vm.total - vm.available
-    rss_sum = 0
-    for p in psutil.process_iter(["name", "cmdline", "memory_info"]):
-        name = (p.info.get("name") or "").lower()
-        cmd  = " ".join(p.info.get("cmdline") or []).lower()
-        if "lm studio" in name or "lmstudio" in cmd or "lms " in cmd:
-            try:
-                rss_sum += p.info["memory_info"].rss
-            except Exception:
-                pass
+    rss_sum, _ = rss_total(find_lmstudio_procs())
     return {"system_used_bytes": sys_used, "lmstudio_rss_bytes": rss_sum}
 
+SAFE_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+# Maps every disallowed ASCII char to NUL; runs of NUL are what SAFE_RE would collapse
+SAFE_TABLE = {c: "\0" for c in range(128) if SAFE_RE.match(chr(c))}
+
+def safe_name(model):
+    # Make safe filenames (model ids may contain slashes or spaces)
+    name = str(model)
+    if name.isascii():
+        marked = name.translate(SAFE_TABLE)
+        if "\0\0" not in marked:
+            return marked.replace("\0", "_")[:200]
+    return SAFE_RE.sub("_", name)[:200]
+
+def output_paths(model):
+    base = safe_name(model)
+    return (OUT_DIR / f"{base}.json", OUT_DIR / f"{base}_powermetrics.log",
+            OUT_DIR / f"{base}.txt", OUT_DIR / f"{base}.html")
+
 def extract_html(text):
+    # Fast path: the whole answer is already an HTML document, no regex scan needed
+    stripped = text.lstrip()
+    head = stripped[:200].lower()
+    if head.startswith("<!doctype") or head.startswith("<html"):
+        end = stripped.rfind("</html>")
+        if end == -1:
+            end = stripped.rfind("</HTML>")
+        if end != -1:
+            return stripped[:end + len("</html>")]
+    text = text[:EXTRACT_MAX_CHARS]
     # Strip chain-of-thought blocks like <think> ... </think>
     # Do not extract HTML from inside these reasoning blocks
-    sanitized = re.sub(r"(?is)<think[\s\S]*?</think>", "", text)
+    sanitized = THINK_RE.sub("", text)
     # Prefer explicit HTML tags
-    m = re.search(r"(<html[\s\S]*?</html>)", sanitized, re.I)
+    m = HTML_RE.search(sanitized)
     if m:
-        return m.group(1)
+        return m.group(0)
     # Try fenced code blocks ```html ... ```
-    m = re.search(r"```(?:html)?\s*([\s\S]*?)```", sanitized, re.I)
-    if m:
-        block = m.group(1).strip()
-        if "<html" in block.lower():
-            return block
+    if "```" in sanitized:
+        m = FENCE_RE.search(sanitized)
+        if m:
+            block = m.group(1).strip()
+            if "<html" in block.lower():
+                return block
     # Fallback: wrap content (also using sanitized text)
-    return f"<!doctype html><html><head><meta charset='utf-8'><title>Output</title></head><body><pre>{json.dumps(sanitized)[:20000]}</pre></body></html>"
+    return f"<!doctype html><html><head><meta charset='utf-8'><title>Output</title></head><body><pre>{json.dumps(sanitized[:20000])}</pre></body></html>"
 
 def chat_once(model_id, timeout_s=GEN_TIMEOUT_SECONDS):
     payload = {
@@ -366,7 +551,7 @@ def chat_once(model_id, timeout_s=GEN_TIMEOUT_SECONDS):
         payload["num_ctx"] = NUM_CTX
     # Prefer REST API for rich stats; only fallback to OpenAI API if REST endpoint is unavailable
     try:
-        r = requests.post(f"{REST_BASE}/chat/completions", json=payload, timeout=(5, timeout_s))
+        r = SESSION.post(f"{REST_BASE}/chat/completions", json=payload, timeout=(5, timeout_s))
         if r.ok:
             return r.json()
         # Fallback only if endpoint clearly not found
@@ -379,7 +564,7 @@ def chat_once(model_id, timeout_s=GEN_TIMEOUT_SECONDS):
         raise
     except (requests.exceptions.ConnectionError, requests.exceptions.InvalidURL):
         # Try OpenAI-compatible endpoint as a true fallback
-        r2 = requests.post(f"{OPENAI_BASE}/chat/completions", json=payload, timeout=(5, timeout_s))
+        r2 = SESSION.post(f"{OPENAI_BASE}/chat/completions", json=payload, timeout=(5, timeout_s))
         r2.raise_for_status()
         return r2.json()
 
@@ -399,14 +584,15 @@ def main():
         sys.exit(1)
 
     print(f"Found {len(models)} models: {[m['display'] for m in models]}")
+    paths = {m["api_id"]: output_paths(m["api_id"]) for m in models}
+    # Report rows are kept in memory: read what is already on disk once, then add each new result
+    report_rows = report_builder.load_results(OUT_DIR) if report_builder is not None else []
+    max_samples = int((GEN_TIMEOUT_SECONDS + POWERMETRICS_SLACK_SECONDS) * 1000 / POWERMETRICS_INTERVAL_MS)
     for entry in models:
         model_api_id = entry["api_id"]
         model_cli_key = entry["cli_key"]
         print(f"\n=== Benchmarking {model_api_id} (load: {model_cli_key}) ===", flush=True)
-        
-        # Make safe filenames (model ids may contain slashes or spaces)
-        safe_model = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(model_api_id))[:200]
-        json_path = OUT_DIR / f"{safe_model}.json"
+        json_path, log_path, txt_path, out_html_path = paths[model_api_id]
         
         # if there are already model run data for the current model in that folder: skip the benchmark and move to the next model
         if json_path.exists():
@@ -431,21 +617,11 @@ def main():
 
         mem_after_load = snapshot_memory()
 
-        # Make safe filenames (model ids may contain slashes or spaces)
-        safe_model = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(model_api_id))[:200]
-
-        # Start power logging + RAM sampler
-        log_path = OUT_DIR / f"{safe_model}_powermetrics.log"
-        psamp = PowerSampler(str(log_path), sampler_combo=sampler_combo, interval_ms=POWERMETRICS_INTERVAL_MS)
+        # Start power logging; the sampler's reader thread also tracks RAM HWM
+        ram = RamTracker()
+        psamp = PowerSampler(str(log_path), sampler_combo=sampler_combo, interval_ms=POWERMETRICS_INTERVAL_MS, ram=ram,
+                             max_samples=max_samples)
         psamp.start()
-        ram_stop_evt = threading.Event()
-        ram_results = {}
-        def _ram_thread():
-            hwm_sys, hwm_lms = sample_ram_hwm(ram_stop_evt, interval=1.0)
-            ram_results["system_used_hwm_bytes"] = hwm_sys
-            ram_results["lmstudio_rss_hwm_bytes"] = hwm_lms
-        t = threading.Thread(target=_ram_thread, daemon=True)
-        t.start()
 
         # Generate once (only if load succeeded)
         result = None
@@ -473,18 +649,14 @@ def main():
                 timer_stop_evt.set()
                 timer_thread.join(timeout=1)
                 print("", flush=True)
-                # stop samplers
-                ram_stop_evt.set()
-                t.join(timeout=3)
+                # stop sampler
                 psamp.stop()
         else:
-            # stop samplers if we didn't attempt generation
-            ram_stop_evt.set()
-            t.join(timeout=3)
+            # stop sampler if we didn't attempt generation
             psamp.stop()
 
-        # Parse powermetrics
-        power_stats = parse_powermetrics_log(str(log_path))
+        # Collect power stats parsed while powermetrics was running
+        power_stats = psamp.power_stats()
         if isinstance(power_stats, dict) and sampler_combo:
             power_stats["samplers"] = sampler_combo
 
@@ -500,19 +672,19 @@ def main():
             except Exception:
                 text = json.dumps(result)
             # Save raw text response
-            raw_text_path = OUT_DIR / f"{safe_model}.txt"
+            raw_text_path = txt_path
             try:
-                raw_text_path.write_text(text)
+                raw_text_path.write_bytes(text.encode("utf-8"))
             except Exception:
                 raw_text_path = None
             html = extract_html(text)
-            html_path = OUT_DIR / f"{safe_model}.html"
-            html_path.write_text(html)
+            html_path = out_html_path
+            html_path.write_bytes(html.encode("utf-8"))
 
         # Build metrics JSON
-        usage = (result.get("usage", {}) if result else {}) or {}
+        usage = (result or {}).get("usage") or {}
         # Fallback tokens/sec if REST stats absent
-        completion_tokens = usage.get("completion_tokens") or usage.get("completion_tokens", 0)
+        completion_tokens = usage.get("completion_tokens") or 0
         tokens_per_sec_fallback = None
         try:
             if gen_time_s > 0 and completion_tokens:
@@ -526,7 +698,7 @@ def main():
             "generation_time_seconds": gen_time_s,
             "rest_stats": (result.get("stats", {}) if result else {}),
             "usage": usage,
-            "model_info": (result.get("model_info", {}) if result else {}),
+            "model_info": (result or {}).get("model_info", {}),
             "runtime": (result.get("runtime", {}) if result else {}),
             "power": power_stats,
             "memory": {
@@ -545,7 +717,7 @@ def main():
                     "system_used_bytes": (mem_after_generation["system_used_bytes"] - mem_after_load["system_used_bytes"]),
                     "lmstudio_rss_bytes": (mem_after_generation["lmstudio_rss_bytes"] - mem_after_load["lmstudio_rss_bytes"]),
                 },
-                "hwm_during_generation": ram_results,
+                "hwm_during_generation": ram.results(),
             },
             "derived": {
                 "tokens_per_second_fallback": tokens_per_sec_fallback
@@ -570,8 +742,9 @@ def main():
                 "generation": gen_error,
             }
         }
-        json_path = OUT_DIR / f"{safe_model}.json"
-        json_path.write_text(json.dumps(metrics, indent=2))
+        json_path.write_bytes(json_bytes(metrics))
+        report_rows.append((json_path, metrics))
+        report_rows.sort(key=lambda row: row[0])
         saved_html = html_path.name if html_path else "<no-html>"
         print(f"Saved: {saved_html}, {json_path.name}")
 
@@ -586,9 +759,8 @@ def main():
             OUT_DIR.mkdir(parents=True, exist_ok=True)
             report_path = OUT_DIR / "index.html"
             if report_builder is not None:
-                rows = report_builder.load_results(OUT_DIR)
-                html = report_builder.build_html(rows, title="LM Studio Bench Report", prompt_text=PROMPT, out_path=report_path)
-                report_path.write_text(html)
+                parts = report_builder.build_html_parts(report_rows, title="LM Studio Bench Report", prompt_text=PROMPT, out_path=report_path)
+                report_builder.write_html(report_path, parts)
                 print(f"Updated report: {report_path.resolve()}")
             else:
                 try:
@@ -604,9 +776,8 @@ def main():
         OUT_DIR.mkdir(parents=True, exist_ok=True)
         report_path = OUT_DIR / "index.html"
         if report_builder is not None:
-            rows = report_builder.load_results(OUT_DIR)
-            html = report_builder.build_html(rows, title="LM Studio Bench Report", prompt_text=PROMPT, out_path=report_path)
-            report_path.write_text(html)
+            parts = report_builder.build_html_parts(report_rows, title="LM Studio Bench Report", prompt_text=PROMPT, out_path=report_path)
+            report_builder.write_html(report_path, parts)
             print(f"\nReport written to: {report_path.resolve()}")
         else:
             # Fallback: shell out to the script if import failed
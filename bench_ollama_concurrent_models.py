@@ -1,11 +1,19 @@
 #!/usr/bin/env python3
-import os, re, sys, json, time, shutil, threading, subprocess, hashlib
+import os, re, sys, json, array, time, signal, shutil, select, asyncio, threading, subprocess, hashlib
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict
 
-import requests
+import httpx
 import psutil
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # --------- Config ----------
 OLLAMA_API_BASE = os.environ.get("OLLAMA_API_BASE", "http://127.0.0.1:11434")
@@ -14,100 +22,246 @@ CONCURRENCY_LEVELS = [1, 2, 3, 4, 5, 6, 7, 8] # Number of parallel requests
 PROMPT = """write a short story about the city of Cologne in Germany
 """ # The prompt to send to the model
 POWERMETRICS_INTERVAL_MS = 1000 # Sample every 1s
+GEN_TIMEOUT_SECONDS = 300 # a request still running after this long counts as failed
+POWERMETRICS_SLACK_SECONDS = 60 # extra sampling budget beyond GEN_TIMEOUT_SECONDS
 # ---------------------------
 
 def get_out_dir():
     settings_str = f"{MODEL}{PROMPT}{''.join(map(str, CONCURRENCY_LEVELS))}"
-    settings_hash = hashlib.sha256(settings_str.encode('utf-8')).hexdigest()[:10]
+    settings_hash = hashlib.sha256(settings_str.encode('utf-8'), usedforsecurity=False).hexdigest()[:10]
     return Path("reports") / f"ollama-concurrent-bench-{settings_hash}"
 
 OUT_DIR = get_out_dir()
 OUT_DIR.mkdir(parents=True, exist_ok=True)
+REPORT_PATH = OUT_DIR / "summary_report.json"
+LEVELS_PATH = OUT_DIR / "summary_report.jsonl"  # one line per finished level; used to resume
 
 ansi_escape = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+POWER_RE = re.compile(r"(CPU|GPU|ANE).*?Power:\s*([\d.]+)\s*(m?W)", re.I)
+AVG_RE = re.compile(r"Average power:\s*([\d.]+)\s*(m?W)", re.I)
+SECTION_RE = re.compile(r"^(CPU|GPU|ANE)", re.I)
+SAMPLE_DELIMITER = "*** Sampled system activity"
+# /api/generate counters, read straight from the response bytes
+EVAL_COUNT_RE = re.compile(rb'"eval_count"\s*:\s*(\d+)')
+EVAL_DURATION_RE = re.compile(rb'"eval_duration"\s*:\s*(\d+)')
+
+def _to_watts(val, unit):
+    return float(val) / 1000.0 if unit.lower() == "mw" else float(val)
+
+class PowerLogParser:
+    """Collects CPU/GPU watt samples from powermetrics output, one line at a time."""
+    def __init__(self):
+        self.cpu_watts, self.gpu_watts = array.array("d"), array.array("d")
+        self._by_label = {"CPU": self.cpu_watts, "GPU": self.gpu_watts}
+        self._section = None
+
+    def feed(self, line):
+        s = line.strip()
+        if "\x1b" in s:
+            s = ansi_escape.sub("", s)
+        msec = SECTION_RE.match(s)
+        if msec:
+            self._section = msec.group(1).upper()
+        m = POWER_RE.search(s)
+        if m:
+            arr = self._by_label.get(m.group(1).upper())
+            if arr is not None:
+                arr.append(_to_watts(m.group(2), m.group(3)))
+            return
+        m = AVG_RE.search(s)
+        if m and self._section in self._by_label:
+            self._by_label[self._section].append(_to_watts(m.group(1), m.group(2)))
+
+    def stats(self):
+        def stats(arr):
+            if not arr:
+                return {"avg": None, "max": None, "min": None, "samples": 0}
+            if np is not None:
+                a = np.frombuffer(arr, dtype=np.float64)
+                return {"avg": float(a.mean()), "max": float(a.max()), "min": float(a.min()), "samples": len(a)}
+            return {"avg": sum(arr) / len(arr), "max": max(arr), "min": min(arr), "samples": len(arr)}
+        return {"cpu_watts": stats(self.cpu_watts), "gpu_watts": stats(self.gpu_watts)}
 
 class PowerSampler:
-    def __init__(self, out_path, sampler_combo=None, interval_ms=1000):
+    def __init__(self, out_path, sampler_combo=None, interval_ms=1000, ram=None, max_samples=None):
         self.out_path = out_path
+        self.max_samples = max_samples
         self.proc = None
+        self.stop_evt = threading.Event()
         self.sampler_combo = sampler_combo
         self.interval_ms = interval_ms
+        self.parser = PowerLogParser()
+        self.ram = ram
+        self._reader = None
+        self._started = None
+        # Seconds of sampling if powermetrics exited on its own (-n reached) before stop(); None otherwise
+        self.ended_early_after = None
+        # Why powermetrics did not deliver (could not start, nonzero exit, no samples); None otherwise
+        self.failed = None
 
     def start(self):
         # Use powermetrics (needs sudo on macOS)
         sampler = self.sampler_combo or "all"
         cmd = ["powermetrics", "--samplers", sampler, "-i", str(self.interval_ms)]
+        if self.max_samples:
+            cmd += ["-n", str(self.max_samples)]  # bounds the log if stop() is never reached
         if os.name == "posix" and sys.platform == "darwin" and os.geteuid() != 0:
             print("Warning: powermetrics likely needs sudo; power stats may be empty.", file=sys.stderr)
-        self.proc = subprocess.Popen(
-            cmd, stdout=open(self.out_path, "w"), stderr=subprocess.STDOUT, text=True
-        )
+        try:
+            self.proc = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+            )
+        except OSError as e:
+            print(f"Warning: could not start powermetrics: {e}", file=sys.stderr)
+            self.proc = None
+            self.failed = f"could not start: {e}"
+        self._started = time.perf_counter()
+        # Parse while sampling; the log file is kept only as a raw copy.
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+
+    def _lines(self, timeout):
+        # Output lines as they arrive, and None whenever nothing came for `timeout` seconds
+        fd = self.proc.stdout.fileno()
+        pending = b""
+        while True:
+            if not select.select([fd], [], [], timeout)[0]:
+                yield None
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            *lines, pending = (pending + chunk).split(b"\n")
+            for raw in lines:
+                yield raw.decode("utf-8", "ignore") + "\n"
+        if pending:
+            yield pending.decode("utf-8", "ignore")
+
+    def _read_output(self):
+        # RAM is sampled here too, once per powermetrics sample, instead of on its own thread
+        interval = self.interval_ms / 1000.0
+        if self.ram:
+            self.ram.sample()
+        if self.proc:
+            last_tick = time.monotonic()
+            with open(self.out_path, "w", buffering=1) as log:  # line-buffered: the log is current while sampling
+                # Waits at most 2 intervals for output, so RAM is still sampled while powermetrics stalls
+                for line in self._lines(2 * interval):
+                    if line is not None:
+                        log.write(line)
+                        self.parser.feed(line)
+                    if self.ram and ((line is not None and line.startswith(SAMPLE_DELIMITER))
+                                     or time.monotonic() - last_tick >= 2 * interval):
+                        self.ram.sample()
+                        last_tick = time.monotonic()
+            if not self.stop_evt.is_set():
+                try:
+                    rc = self.proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    rc = None
+                if rc == 0 and (self.parser.cpu_watts or self.parser.gpu_watts):
+                    self.ended_early_after = time.perf_counter() - self._started
+                elif rc == 0:
+                    self.failed = "exited without any power samples"
+                else:
+                    self.failed = f"exited with return code {rc}" if rc is not None else "closed its output"
+        # No (more) powermetrics output: fall back to timed RAM samples until stopped
+        if self.ram:
+            while not self.stop_evt.wait(interval):
+                self.ram.sample()
 
     def stop(self):
+        self.stop_evt.set()
         if self.proc:
             try:
-                self.proc.terminate()
+                # powermetrics flushes and exits cleanly on SIGINT; escalate only if it hangs
+                self.proc.send_signal(signal.SIGINT)
                 try:
-                    self.proc.wait(timeout=3)
+                    self.proc.wait(timeout=1)
                 except subprocess.TimeoutExpired:
-                    self.proc.kill()
+                    self.proc.terminate()
+                    try:
+                        self.proc.wait(timeout=2)
+                    except subprocess.TimeoutExpired:
+                        self.proc.kill()
             except Exception:
                 pass
-
-def parse_powermetrics_log(path):
-    cpu_watts, gpu_watts = [], []
-    current_section = None
+        if self._reader:
+            self._reader.join(timeout=3)
+
+    def power_stats(self):
+        return self.parser.stats()
+
+def find_ollama_procs():
+    # Matches the server as well as its model runner processes.
+    return [p for p in psutil.process_iter(["name"]) if "ollama" in (p.info.get("name") or "").lower()]
+
+def rss_total(procs):
+    total, alive = 0, True
+    for p in procs:
+        try:
+            total += p.memory_info().rss
+        except psutil.NoSuchProcess:
+            alive = False
+        except psutil.AccessDenied:
+            pass
+    return total, alive
+
+RAM_RESCAN_EVERY = 10 # Re-discover processes every N samples (runners start on first request)
+
+class RamTracker:
+    """Ollama RSS high-water mark, sampled from PowerSampler's reader thread."""
+    def __init__(self):
+        self.hwm = 0
+        self._procs = None
+        self._ticks = 0
+
+    def sample(self):
+        if self._procs is None:
+            self._procs = find_ollama_procs()
+        rss_sum, alive = rss_total(self._procs)
+        self.hwm = max(self.hwm, rss_sum)
+        self._ticks += 1
+        if not alive or self._ticks % RAM_RESCAN_EVERY == 0:
+            self._procs = find_ollama_procs()
+
+def json_bytes(obj, indent=False):
+    """JSON as UTF-8 bytes; uses orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass  # e.g. ints beyond 64 bit; let the stdlib handle it
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+def load_finished_levels(path=LEVELS_PATH) -> List[Dict]:
+    # A crash mid-write can leave a truncated last line; cut it off so new lines append cleanly.
+    results, good_bytes = [], 0
     try:
-        with open(path, "r", errors="ignore") as f:
+        with open(path, "r+b") as f:
             for line in f:
-                s = ansi_escape.sub("", line.strip())
-                msec = re.match(r"^(CPU|GPU|ANE)", s, re.I)
-                if msec:
-                    current_section = msec.group(1).upper()
-                for label, arr in (("CPU", cpu_watts), ("GPU", gpu_watts)):
-                    m = re.search(fr"{label}.*?Power:\s*([\d.]+)\s*(m?W)", s, re.I)
-                    if m:
-                        val = float(m.group(1))
-                        unit = m.group(2).lower()
-                        arr.append(val / 1000.0 if unit == "mw" else val)
-                m2 = re.search(r"Average power:\s*([\d.]+)\s*(m?W)", s, re.I)
-                if m2 and current_section:
-                    val = float(m2.group(1))
-                    unit = m2.group(2).lower()
-                    watts = val / 1000.0 if unit == "mw" else val
-                    if current_section == "CPU":
-                        cpu_watts.append(watts)
-                    elif current_section == "GPU":
-                        gpu_watts.append(watts)
+                try:
+                    results.append(json.loads(line))
+                except ValueError:
+                    f.truncate(good_bytes)
+                    break
+                good_bytes += len(line)
     except FileNotFoundError:
-        print(f"Warning: Powermetrics log file not found at {path}", file=sys.stderr)
-        return {{}}
+        pass
+    return results
 
-    def stats(arr):
-        return {
-            "avg": (sum(arr) / len(arr)) if arr else None,
-            "max": max(arr) if arr else None,
-            "min": min(arr) if arr else None,
-            "samples": len(arr),
-        }
-    return {"cpu_watts": stats(cpu_watts), "gpu_watts": stats(gpu_watts)}
-
-def sample_ram_hwm(stop_evt, interval=1.0):
-    ollama_hwm = 0
-    while not stop_evt.is_set():
-        rss_sum = 0
-        for p in psutil.process_iter(["name", "cmdline", "memory_info"]):
-            name = (p.info.get("name") or "").lower()
-            if "ollama" in name:
-                try:
-                    rss_sum += p.info["memory_info"].rss
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-        ollama_hwm = max(ollama_hwm, rss_sum)
-        time.sleep(interval)
-    return ollama_hwm
-
-def generate_once(model: str, prompt: str, result_list: list):
+def write_report(all_results: List[Dict]):
+    # os.replace never leaves a half-written summary_report.json behind
+    tmp_path = REPORT_PATH.with_suffix(".json.tmp")
+    tmp_path.write_bytes(json_bytes(all_results, indent=True))
+    os.replace(tmp_path, REPORT_PATH)
+
+def save_level(level_result: Dict, all_results: List[Dict]):
+    with open(LEVELS_PATH, "ab") as f:
+        f.write(json_bytes(level_result) + b"\n")
+    write_report(all_results)
+
+async def generate_once(idx: int, client: httpx.AsyncClient, model: str, prompt: str) -> Dict:
     payload = {
         "model": model,
         "prompt": prompt,
@@ -115,115 +269,134 @@ def generate_once(model: str, prompt: str, result_list: list):
     }
     try:
         t0 = time.perf_counter()
-        r = requests.post(f"{OLLAMA_API_BASE}/api/generate", json=payload)
+        # wait_for bounds the whole request; httpx timeouts only apply per read or write
+        r = await asyncio.wait_for(client.post("/api/generate", json=payload), GEN_TIMEOUT_SECONDS)
         r.raise_for_status()
-        response_data = r.json()
+        body = r.content
         gen_time_s = time.perf_counter() - t0
 
-        eval_count = response_data.get("eval_count", 0)
-        eval_duration_ns = response_data.get("eval_duration", 1)
+        # Only two counters are needed; don't decode the generated text
+        m = EVAL_COUNT_RE.search(body)
+        eval_count = int(m.group(1)) if m else 0
+        m = EVAL_DURATION_RE.search(body)
+        eval_duration_ns = int(m.group(1)) if m else 1
         tps = eval_count / (eval_duration_ns / 1e9) if eval_duration_ns > 0 else 0
 
-        result_list.append({
+        return {
+            "request": idx,
             "tps": tps,
             "generation_time_seconds": gen_time_s,
             "eval_count": eval_count,
             "eval_duration_ns": eval_duration_ns,
             "error": None
-        })
-    except requests.RequestException as e:
-        result_list.append({"error": str(e)})
+        }
+    except httpx.HTTPError as e:
+        return {"request": idx, "error": str(e)}
+    except asyncio.TimeoutError:
+        return {"request": idx, "error": f"timed out after {GEN_TIMEOUT_SECONDS}s"}
     except Exception as e:
-        result_list.append({"error": f"An unexpected error occurred: {e}"})
+        return {"request": idx, "error": f"An unexpected error occurred: {e}"}
 
 
-def main():
+async def main():
     print(f"Starting concurrent benchmark for model: {MODEL}")
     print(f"Output directory: {OUT_DIR.resolve()}")
 
-    all_results = []
-
-    for concurrency in CONCURRENCY_LEVELS:
-        print(f"\n--- Testing with {concurrency} parallel requests ---")
-
-        log_path = OUT_DIR / f"concurrency_{concurrency}_powermetrics.log"
-        psamp = PowerSampler(str(log_path), interval_ms=POWERMETRICS_INTERVAL_MS)
-        
-        ram_stop_evt = threading.Event()
-        ram_hwm = 0
-        def _ram_thread():
-            nonlocal ram_hwm
-            ram_hwm = sample_ram_hwm(ram_stop_evt, interval=1.0)
-        
-        ram_sampler_thread = threading.Thread(target=_ram_thread, daemon=True)
-
-        threads: List[threading.Thread] = []
-        thread_results: List[Dict] = []
-        
-        start_time = time.perf_counter()
-        
-        psamp.start()
-        ram_sampler_thread.start()
-
-        for _ in range(concurrency):
-            thread = threading.Thread(target=generate_once, args=(MODEL, PROMPT, thread_results))
-            threads.append(thread)
-            thread.start()
-
-        for thread in threads:
-            thread.join()
-            
-        end_time = time.perf_counter()
-        
-        ram_stop_evt.set()
-        ram_sampler_thread.join()
-        psamp.stop()
-
-        total_time = end_time - start_time
-        power_stats = parse_powermetrics_log(str(log_path))
-
-        successful_runs = [r for r in thread_results if r.get("error") is None]
-        
-        if not successful_runs:
-            print("All requests failed for this concurrency level.", file=sys.stderr)
-            # Log errors from thread_results
-            for i, res in enumerate(thread_results):
-                print(f"  Request {i+1} error: {res.get('error')}", file=sys.stderr)
-            continue
-
-        total_tokens = sum(r.get("eval_count", 0) for r in successful_runs)
-        avg_tps = sum(r.get("tps", 0) for r in successful_runs) / len(successful_runs)
-        
-        level_result = {
-            "concurrency": concurrency,
-            "total_time_seconds": total_time,
-            "avg_tps": avg_tps,
-            "total_tokens": total_tokens,
-            "ram_hwm_bytes": ram_hwm,
-            "power": power_stats,
-            "runs": thread_results
-        }
-        all_results.append(level_result)
-
-        print(f"  Avg. Tokens/Sec: {avg_tps:.2f}")
-        print(f"  Total Time: {total_time:.2f}s")
-        print(f"  Ollama RAM High-Water Mark: {ram_hwm / (1024**3):.2f} GB")
-        if power_stats.get("cpu_watts", {}).get("avg"):
-            print(f"  Avg. CPU Power: {power_stats['cpu_watts']['avg']:.2f} W")
-        if power_stats.get("gpu_watts", {}).get("avg"):
-            print(f"  Avg. GPU Power: {power_stats['gpu_watts']['avg']:.2f} W")
-
-    # Save final report
-    report_path = OUT_DIR / "summary_report.json"
-    with open(report_path, "w") as f:
-        json.dump(all_results, f, indent=2)
-    
-    print(f"\nBenchmark finished. Full report saved to: {report_path.resolve()}")
-
-    # Print summary table
-    print("\n--- Benchmark Summary ---")
-    print(f"{ 'Concurrency':<13} | {'Avg TPS':<10} | {'CPU Power (W)':<15} | {'GPU Power (W)':<15} | {'RAM HWM (GB)':<15}")
-    print("-" * 75)
+    all_results = load_finished_levels()
+    finished = {r.get("concurrency") for r in all_results}
+    if finished:
+        print(f"Resuming: concurrency levels {sorted(finished)} already done, see {LEVELS_PATH}")
+
+    # One event loop and one keep-alive pool sized for the highest concurrency level
+    max_concurrency = max(CONCURRENCY_LEVELS)
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+    async with httpx.AsyncClient(base_url=OLLAMA_API_BASE, timeout=None, limits=limits) as client:
+        # Open a pooled connection before the first timed level
+        try:
+            await client.get("/api/tags", timeout=5)
+        except httpx.HTTPError:
+            pass
+
+        for concurrency in CONCURRENCY_LEVELS:
+            if concurrency in finished:
+                continue
+            print(f"\n--- Testing with {concurrency} parallel requests ---")
+
+            log_path = OUT_DIR / f"concurrency_{concurrency}_powermetrics.log"
+            ram = RamTracker()
+            psamp = PowerSampler(str(log_path), interval_ms=POWERMETRICS_INTERVAL_MS, ram=ram,
+                                 max_samples=int((GEN_TIMEOUT_SECONDS + POWERMETRICS_SLACK_SECONDS) * 1000 / POWERMETRICS_INTERVAL_MS))
+
+            start_time = time.perf_counter()
+
+            psamp.start()
+
+            # gather() fills one slot per request in submission order, whatever order they finish in
+            run_results: List[Dict] = await asyncio.gather(
+                *(generate_once(i, client, MODEL, PROMPT) for i in range(concurrency))
+            )
+
+            end_time = time.perf_counter()
+
+            psamp.stop()
+            ram_hwm = ram.hwm
+            if psamp.failed:
+                print(f"Warning: powermetrics {psamp.failed}; power stats for this level are missing or partial.",
+                      file=sys.stderr)
+            elif psamp.ended_early_after is not None:
+                print(f"Warning: powermetrics stopped after {psamp.ended_early_after:.0f}s (its sample cap) but the level "
+                      f"ran {end_time - start_time:.0f}s; power stats cover only that first part.", file=sys.stderr)
+
+            total_time = end_time - start_time
+            power_stats = psamp.power_stats()
+
+            successful_runs = [r for r in run_results if r.get("error") is None]
+
+            if not successful_runs:
+                print("All requests failed for this concurrency level.", file=sys.stderr)
+                # Log errors from run_results
+                for res in run_results:
+                    print(f"  Request {res['request'] + 1} error: {res.get('error')}", file=sys.stderr)
+                continue
+
+            total_tokens = sum(r.get("eval_count", 0) for r in successful_runs)
+            avg_tps = sum(r.get("tps", 0) for r in successful_runs) / len(successful_runs)
+
+            level_result = {
+                "concurrency": concurrency,
+                "total_time_seconds": total_time,
+                "avg_tps": avg_tps,
+                "total_tokens": total_tokens,
+                "ram_hwm_bytes": ram_hwm,
+                "power": power_stats,
+                # set when the powermetrics sample cap ended before the level did
+                "power_covered_seconds": psamp.ended_early_after,
+                "power_error": psamp.failed,
+                "runs": run_results
+            }
+            all_results.append(level_result)
+            save_level(level_result, all_results)
+
+            lines = [
+                f"  Avg. Tokens/Sec: {avg_tps:.2f}",
+                f"  Total Time: {total_time:.2f}s",
+                f"  Ollama RAM High-Water Mark: {ram_hwm / (1024**3):.2f} GB",
+            ]
+            if power_stats.get("cpu_watts", {}).get("avg"):
+                lines.append(f"  Avg. CPU Power: {power_stats['cpu_watts']['avg']:.2f} W")
+            if power_stats.get("gpu_watts", {}).get("avg"):
+                lines.append(f"  Avg. GPU Power: {power_stats['gpu_watts']['avg']:.2f} W")
+            print("\n".join(lines))
+
+    write_report(all_results)
+    print(f"\nBenchmark finished. Full report saved to: {REPORT_PATH.resolve()}")
+
+    # Print summary table in one write
+    rows = [
+        "\n--- Benchmark Summary ---",
+        f"{ 'Concurrency':<13} | {'Avg TPS':<10} | {'CPU Power (W)':<15} | {'GPU Power (W)':<15} | {'RAM HWM (GB)':<15}",
+        "-" * 75,
+    ]
     for result in all_results:
         cpu_power = result.get("power", {}).get("cpu_watts", {}).get("avg", "N/A")
         gpu_power = result.get("power", {}).get("gpu_watts", {}).get("avg", "N/A")
@@ -232,7 +405,8 @@ def main():
         cpu_str = f"{cpu_power:.2f}" if isinstance(cpu_power, float) else "N/A"
         gpu_str = f"{gpu_power:.2f}" if isinstance(gpu_power, float) else "N/A"
 
-        print(f"{result['concurrency']:<13} | {result['avg_tps']:<10.2f} | {cpu_str:<15} | {gpu_str:<15} | {ram_gb:<15.2f}")
+        rows.append(f"{result['concurrency']:<13} | {result['avg_tps']:<10.2f} | {cpu_str:<15} | {gpu_str:<15} | {ram_gb:<15.2f}")
+    sys.stdout.write("\n".join(rows) + "\n")
 
 
 if __name__ == "__main__":
@@ -243,10 +417,10 @@ if __name__ == "__main__":
     
     # Check if ollama is running
     try:
-        requests.get(OLLAMA_API_BASE, timeout=1.5)
-    except requests.ConnectionError:
+        httpx.get(OLLAMA_API_BASE, timeout=1.5)
+    except httpx.TransportError:  # refused, timed out or otherwise unreachable
         print(f"Ollama server not found at {OLLAMA_API_BASE}", file=sys.stderr)
         print("Please ensure the Ollama application is running before starting the benchmark.", file=sys.stderr)
         sys.exit(1)
 
-    main()
+    asyncio.run(main())
@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 import os, re, sys, json, time, threading, hashlib, argparse, subprocess
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import openrouter_report
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --------- Config ----------
 OPENAI_BASE    = "https://openrouter.ai/api/v1"
@@ -35,33 +40,76 @@ TEMP           = .6               # None = use model/server default
 TOP_P          = .95               # None = use model/server default
 GEN_TIMEOUT_SECONDS = 300                    # interrupt generation after ~3m20s
 GEN_TIMER_INTERVAL_SECONDS = 2               # print timer update every 2s
+REPORT_MIN_INTERVAL_SECONDS = 5              # rebuild index.html at most this often while models finish
 # ---------------------------
 
 def get_out_dir():
     # Create a hash of the settings
     settings_str = f"{PROMPT}{MAX_TOKENS}{TEMP}{TOP_P}"
-    settings_hash = hashlib.sha256(settings_str.encode('utf-8')).hexdigest()[:10]
+    settings_hash = hashlib.sha256(settings_str.encode('utf-8'), usedforsecurity=False).hexdigest()[:10]
     return Path("reports") / f"openrouter-bench-{settings_hash}"
 
 OUT_DIR = get_out_dir()
 OUT_DIR.mkdir(parents=True, exist_ok=True)
+# Shared by all worker threads so keep-alive TLS connections to openrouter.ai are reused
+SESSION = requests.Session()
+
+def configure_session(pool_size):
+    # POST is not idempotent, so urllib3 only retries failed connects here, never a sent request
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                          max_retries=Retry(total=2, backoff_factor=0.5))
+    SESSION.mount("https://", adapter)
+
+THINK_RE = re.compile(r"<think[\s\S]*?</think>", re.I | re.S)
+HTML_RE = re.compile(r"<html[\s\S]*?</html>", re.I)
+FENCE_RE = re.compile(r"```(?:html)?\s*([\s\S]*?)```", re.I)
+EXTRACT_MAX_CHARS = 1_000_000  # answers beyond this are runaway generations; don't regex-scan all of it
+
+SAFE_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+# Maps every disallowed ASCII char to NUL; runs of NUL are what SAFE_RE would collapse
+SAFE_TABLE = {c: "\0" for c in range(128) if SAFE_RE.match(chr(c))}
+
+def safe_name(model):
+    # Make safe filenames (model ids may contain slashes or spaces)
+    name = str(model)
+    if name.isascii():
+        marked = name.translate(SAFE_TABLE)
+        if "\0\0" not in marked:
+            return marked.replace("\0", "_")[:200]
+    return SAFE_RE.sub("_", name)[:200]
+
+def iso_timestamp():
+    # Local time in datetime.now().isoformat() layout, from a single time.time() reading
+    t = time.time()
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(t)) + f".{int(t % 1 * 1_000_000):06d}"
+
+def json_bytes(obj):
+    """Pretty-printed JSON as UTF-8 bytes; uses orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass  # e.g. ints beyond 64 bit; let the stdlib handle it
+    return json.dumps(obj, indent=2).encode("utf-8")
 
 def extract_html(text):
+    text = text[:EXTRACT_MAX_CHARS]
     # Strip chain-of-thought blocks like <think> ... </think>
     # Do not extract HTML from inside these reasoning blocks
-    sanitized = re.sub(r"(?is)<think[\s\S]*?</think>", "", text)
+    sanitized = THINK_RE.sub("", text)
     # Prefer explicit HTML tags
-    m = re.search(r"(<html[\s\S]*?</html>)", sanitized, re.I)
+    m = HTML_RE.search(sanitized)
     if m:
-        return m.group(1)
+        return m.group(0)
     # Try fenced code blocks ```html ... ```
-    m = re.search(r"```(?:html)?\s*([\s\S]*?)```", sanitized, re.I)
-    if m:
-        block = m.group(1).strip()
-        if "<html" in block.lower():
-            return block
+    if "```" in sanitized:
+        m = FENCE_RE.search(sanitized)
+        if m:
+            block = m.group(1).strip()
+            if "<html" in block.lower():
+                return block
     # Fallback: wrap content (also using sanitized text)
-    return f"<!doctype html><html><head><meta charset='utf-8'><title>Output</title></head><body><pre>{json.dumps(sanitized)[:20000]}</pre></body></html>"
+    return f"<!doctype html><html><head><meta charset='utf-8'><title>Output</title></head><body><pre>{json.dumps(sanitized[:20000])}</pre></body></html>"
 
 def chat_once(model_id, timeout_s=GEN_TIMEOUT_SECONDS):
     api_key = os.environ.get("OPENROUTER_API_KEY")
@@ -89,15 +137,26 @@ def chat_once(model_id, timeout_s=GEN_TIMEOUT_SECONDS):
     if MAX_TOKENS is not None:
         payload["max_tokens"] = MAX_TOKENS
 
-    r = requests.post(f"{OPENAI_BASE}/chat/completions", headers=headers, json=payload, timeout=(5, timeout_s))
+    r = SESSION.post(f"{OPENAI_BASE}/chat/completions", headers=headers, json=payload, timeout=(5, timeout_s))
     r.raise_for_status()
     return r.json()
 
 report_lock = threading.Lock()
+_last_report_update = 0.0
+
+def maybe_update_report(json_path, metrics):
+    # Models finishing close together share one rebuild; main() always does a final one
+    global _last_report_update
+    with report_lock:
+        if time.monotonic() - _last_report_update < REPORT_MIN_INTERVAL_SECONDS:
+            openrouter_report.remember_result(json_path, metrics)
+            return
+        openrouter_report.update_report(OUT_DIR, new_record=(json_path, metrics))
+        _last_report_update = time.monotonic()
 
 def benchmark_model(model_id):
     print(f"Starting benchmark for {model_id}", flush=True)
-    safe_model = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(model_id))[:200]
+    safe_model = safe_name(model_id)
     json_path = OUT_DIR / f"{safe_model}.json"
 
     if json_path.exists():
@@ -128,17 +187,17 @@ def benchmark_model(model_id):
         
         raw_text_path = OUT_DIR / f"{safe_model}.txt"
         try:
-            raw_text_path.write_text(text)
+            raw_text_path.write_bytes(text.encode("utf-8"))
         except Exception:
             raw_text_path = None
 
         html = extract_html(text)
         html_path = OUT_DIR / f"{safe_model}.html"
-        html_path.write_text(html)
+        html_path.write_bytes(html.encode("utf-8"))
 
-    usage = (result.get("usage", {}) if result else {}) or {}
+    usage = (result or {}).get("usage") or {}
     cost = usage.get("cost")
-    completion_tokens = usage.get("completion_tokens") or usage.get("completion_tokens", 0)
+    completion_tokens = usage.get("completion_tokens") or 0
     tokens_per_sec = None
     try:
         if gen_time_s is not None and gen_time_s > 0 and completion_tokens:
@@ -148,11 +207,11 @@ def benchmark_model(model_id):
 
     metrics = {
         "model": model_id,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": iso_timestamp(),
         "generation_time_seconds": gen_time_s,
         "cost": cost,
         "usage": usage,
-        "model_info": (result.get("model_info", {}) if result else {}),
+        "model_info": (result or {}).get("model_info", {}),
         "derived": {
             "tokens_per_second": tokens_per_sec
         },
@@ -170,11 +229,10 @@ def benchmark_model(model_id):
             "generation": gen_error,
         }
     }
-    json_path.write_text(json.dumps(metrics, indent=2))
+    json_path.write_bytes(json_bytes(metrics))
     saved_html = html_path.name if html_path else "<no-html>"
     print(f"Saved: {saved_html}, {json_path.name}")
-    with report_lock:
-        openrouter_report.update_report(OUT_DIR)
+    maybe_update_report(json_path, metrics)
 
 def main():
     parser = argparse.ArgumentParser(description="Benchmark OpenRouter models.")
@@ -193,13 +251,21 @@ def main():
         print(f"No models found in '{args.models_file}'.", file=sys.stderr)
         sys.exit(1)
 
+    # Skip models with results on disk here instead of spending a worker on each
+    pending = [m for m in models_to_benchmark if not (OUT_DIR / f"{safe_name(m)}.json").exists()]
+    skipped = len(models_to_benchmark) - len(pending)
+    if skipped:
+        print(f"Skipping {skipped} models with existing results.")
+    models_to_benchmark = pending
+
     print(f"Benchmarking {len(models_to_benchmark)} models: {models_to_benchmark}")
+    configure_session(args.concurrency)
 
     # Create initial empty report
     openrouter_report.update_report(OUT_DIR)
     print(f"Report is at: {OUT_DIR.resolve() / 'index.html'}")
 
-    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="bench") as executor:
         futures = [executor.submit(benchmark_model, model_id) for model_id in models_to_benchmark]
         for future in as_completed(futures):
             try:
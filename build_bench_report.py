@@ -1,65 +1,85 @@
 #!/usr/bin/env python3
 import argparse
+import ctypes
+import functools
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
 from pathlib import Path
 from urllib.parse import quote
 import platform
 import subprocess
+import sys
 try:
     import psutil
 except Exception:
     psutil = None
+from report_common import (PageTemplate, create_screenshots_batch, json_loads, json_script_bytes,
+                           preview_image, read_bytes)
 
 
-def create_screenshot(html_path: Path, screenshot_path: Path) -> bool:
-    """Create a screenshot of an HTML file using playwright."""
+def _json_files(folder: Path):
+    # One scandir pass; DirEntry caches the type, so no extra stat per entry
     try:
-        from playwright.sync_api import sync_playwright
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page(viewport={"width": 1200, "height": 800})
-            page.goto(f"file://{html_path.absolute()}")
-            page.wait_for_load_state("networkidle")
-            page.screenshot(path=screenshot_path)
-            browser.close()
-        return True
-    except ImportError:
-        print("Warning: playwright not installed. Run: pip install playwright && playwright install chromium")
-        return False
-    except Exception as e:
-        print(f"Error creating screenshot for {html_path}: {e}")
-        return False
+        with os.scandir(folder) as it:
+            names = [e.name for e in it if e.name.endswith(".json") and e.is_file()]
+    except FileNotFoundError:
+        return []
+    return [folder / name for name in sorted(names)]
+
+
+# Parsed result files by path, with the (mtime_ns, size) they were read at
+_parsed_results = {}
+
+
+def _read_result(p: Path):
+    try:
+        st = p.stat()
+        key = str(p)
+        cached = _parsed_results.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return p, cached[2]
+        data = json_loads(read_bytes(p))
+        _parsed_results[key] = (st.st_mtime_ns, st.st_size, data)
+        return p, data
+    except Exception:
+        return None
 
 
 def load_results(folder: Path):
-    rows = []
-    for p in sorted(folder.glob("*.json")):
-        try:
-            data = json.loads(p.read_text())
-        except Exception:
-            continue
-        rows.append((p, data))
-    return rows
+    # Many small files: overlap the reads, keep the sorted order.
+    # Resolved once so every row path is absolute and _relative_path never has to resolve it again
+    paths = _json_files(Path(folder).resolve())
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(paths)), thread_name_prefix="load_results") as ex:
+        return [row for row in ex.map(_read_result, paths) if row is not None]
+
+
+# Shared stand-in for missing sub-objects while reading records; never mutated
+_NO_DICT = {}
+
+_TPS_FALLBACK_KEYS = ("token_per_second", "tok_per_sec", "tps")
+_NUMERIC = (int, float)
 
 
 def pick_tokens_per_sec(d):
-    stats = d.get("rest_stats") or {}
-    keys = [
-        "tokens_per_second",
-        "token_per_second",
-        "tok_per_sec",
-        "tps",
-    ]
-    for k in keys:
-        v = stats.get(k)
-        if isinstance(v, (int, float)):
+    stats = d.get("rest_stats")
+    if stats:
+        # Nearly every record uses the canonical key; the older spellings only on a miss
+        v = stats.get("tokens_per_second")
+        if type(v) in _NUMERIC:
+            return v
+        for k in _TPS_FALLBACK_KEYS:
+            v = stats.get(k)
+            if type(v) in _NUMERIC:
+                return v
+    derived = d.get("derived")
+    if derived:
+        v = derived.get("tokens_per_second_fallback")
+        if type(v) in _NUMERIC:
             return v
-    derived = d.get("derived") or {}
-    v = derived.get("tokens_per_second_fallback")
-    if isinstance(v, (int, float)):
-        return v
     return None
 
 
@@ -68,13 +88,20 @@ def fmt_float(v, digits=2):
 
 
 def _relative_path(path_value, base_dir: Path):
+    # base_dir must already be resolved (build_html resolves it once; Path.cwd() is physical)
     if not path_value:
         return None
     try:
         path_obj = Path(path_value)
     except TypeError:
         return None
-    base_resolved = base_dir.resolve()
+    base_resolved = base_dir
+    if path_obj.is_absolute() and ".." not in path_obj.parts:
+        # Result files store resolved absolute paths: no realpath needed when they sit under base_dir
+        try:
+            return path_obj.relative_to(base_resolved).as_posix()
+        except ValueError:
+            pass
     candidate = path_obj if path_obj.is_absolute() else base_resolved / path_obj
     try:
         path_resolved = candidate.resolve()
@@ -91,158 +118,140 @@ def _relative_path(path_value, base_dir: Path):
             return path_resolved.as_posix()
 
 
+def _html_text(v):
+    # Escaped once here so the report's render() can put it straight into innerHTML
+    return escape(str(v)) if v is not None else None
+
+
 def _relative_href(rel_path: str):
     if not rel_path:
         return None
     return quote(rel_path, safe="/@:+,._-~=")
 
 
+@functools.lru_cache(maxsize=1)
 def _is_macos():
     return platform.system() == "Darwin"
 
 
+@functools.lru_cache(maxsize=1)
+def _libsystem():
+    return ctypes.CDLL("/usr/lib/libSystem.dylib")
+
+
+def _sysctl_raw(name: str):
+    # sysctlbyname() in-process instead of fork/exec of /usr/sbin/sysctl; None if unavailable
+    try:
+        lib = _libsystem()
+        key = name.encode()
+        size = ctypes.c_size_t(0)
+        if lib.sysctlbyname(key, None, ctypes.byref(size), None, 0) != 0 or not size.value:
+            return None
+        buf = ctypes.create_string_buffer(size.value)
+        if lib.sysctlbyname(key, buf, ctypes.byref(size), None, 0) != 0:
+            return None
+        return buf.raw[:size.value]
+    except Exception:
+        return None
+
+
+def _sysctl_str(name: str):
+    raw = _sysctl_raw(name)
+    if not raw:
+        return None
+    return raw.split(b"\0", 1)[0].decode("utf-8", "replace").strip() or None
+
+
+def _sysctl_int(name: str):
+    raw = _sysctl_raw(name)
+    return int.from_bytes(raw, sys.byteorder) if raw and len(raw) in (4, 8) else None
+
+
+# GPU names from system_profiler, reused until the next reboot (the hardware can't change before then).
+# Same cache dir and LMTA_DISABLE_CACHE switch as the benchmark scripts
+CACHE_DIR = Path.home() / ".cache" / "lmtestauto"
+CACHE_DISABLED = os.environ.get("LMTA_DISABLE_CACHE") == "1"
+GPU_CACHE_PATH = CACHE_DIR / "gpu.json"
+
+
+def _gpu_from_system_profiler():
+    try:
+        out = subprocess.run(["/usr/sbin/system_profiler", "-detailLevel", "mini", "SPDisplaysDataType"], capture_output=True, text=True, timeout=5)
+    except Exception:
+        return None
+    models = []
+    for line in out.stdout.splitlines():
+        if "Chipset Model:" in line:
+            parts = line.split(":", 1)
+            if len(parts) == 2:
+                models.append(parts[1].strip())
+    # dedupe preserving order
+    return ", ".join(dict.fromkeys(models)) or None
+
+
+def _macos_gpu():
+    boot = _sysctl_raw("kern.boottime")
+    boot_key = boot.hex() if boot and not CACHE_DISABLED else None
+    if boot_key:
+        try:
+            cached = json_loads(read_bytes(GPU_CACHE_PATH))
+            if cached.get("boot") == boot_key:
+                return cached.get("gpu")
+        except Exception:
+            pass
+    gpu = _gpu_from_system_profiler()
+    if boot_key and gpu:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            GPU_CACHE_PATH.write_text(json.dumps({"boot": boot_key, "gpu": gpu}))
+        except Exception:
+            pass
+    return gpu
+
+
+@functools.lru_cache(maxsize=1)
 def _machine_info():
+    # Hardware doesn't change while the process runs; system_profiler alone takes seconds
     info = {"cpu": None, "gpu": None, "ram_bytes": None}
+    macos = _is_macos()
     # CPU
     cpu = None
-    if _is_macos():
-        try:
-            out = subprocess.run(["/usr/sbin/sysctl", "-n", "machdep.cpu.brand_string"], capture_output=True, text=True, timeout=2)
-            if out.stdout.strip():
-                cpu = out.stdout.strip()
-        except Exception:
-            pass
+    if macos:
+        cpu = _sysctl_str("machdep.cpu.brand_string")
+        if not cpu:
+            try:
+                out = subprocess.run(["/usr/sbin/sysctl", "-n", "machdep.cpu.brand_string"], capture_output=True, text=True, timeout=2)
+                if out.stdout.strip():
+                    cpu = out.stdout.strip()
+            except Exception:
+                pass
     info["cpu"] = cpu or (platform.processor() or platform.machine())
     # RAM
-    if psutil is not None:
+    if macos:
+        info["ram_bytes"] = _sysctl_int("hw.memsize")
+    if info["ram_bytes"] is None and psutil is not None:
         try:
             info["ram_bytes"] = psutil.virtual_memory().total
         except Exception:
             info["ram_bytes"] = None
-    else:
-        info["ram_bytes"] = None
     # GPU (macOS)
-    gpu = None
-    if _is_macos():
-        try:
-            out = subprocess.run(["/usr/sbin/system_profiler", "SPDisplaysDataType"], capture_output=True, text=True, timeout=5)
-            models = []
-            for line in out.stdout.splitlines():
-                if "Chipset Model:" in line:
-                    parts = line.split(":", 1)
-                    if len(parts) == 2:
-                        models.append(parts[1].strip())
-            if models:
-                # dedupe preserving order
-                gpu = ", ".join(dict.fromkeys(models))
-        except Exception:
-            pass
-    info["gpu"] = gpu
+    info["gpu"] = _macos_gpu() if macos else None
     return info
 
 
-def build_html(rows, title="LM Studio Bench Report", prompt_text=None, out_path: Path = None, create_screenshots: bool = True):
-    # Prepare normalized rows for the table
-    base_dir = (out_path.parent if out_path else Path.cwd()).resolve()
-    records = []
-    total_gen_time = 0.0
-    for p, d in rows:
-        files = d.get("files") or {}
-        power = d.get("power") or {}
-        mem = d.get("memory") or {}
-        usage = d.get("usage") or {}
-        prompt = d.get("prompt") or {}
-        prompt_text_in_json = d.get("prompt_text") or prompt.get("text")
-        if prompt_text is None:
-            prompt_text = prompt_text_in_json
-        mi = d.get("model_info") or {}
-        rt = d.get("runtime") or {}
-        params = mi.get("parameters") or mi.get("n_params") or mi.get("params") or rt.get("n_params")
-        quant = mi.get("quantization") or mi.get("quant") or rt.get("quantization") or rt.get("q_type")
-        def _pretty_params(x):
-            try:
-                v = float(x)
-                if v >= 1e9:
-                    return f"{v/1e9:.1f}B"
-                if v >= 1e6:
-                    return f"{v/1e6:.1f}M"
-                return str(int(v))
-            except Exception:
-                return str(x) if x is not None else None
-        model_size = _pretty_params(params)
-        gstats = power.get("gpu_watts") or {}
-        gen_time = d.get("generation_time_seconds")
-        if isinstance(gen_time, (int, float)):
-            total_gen_time += gen_time
-        html_path = _relative_path(files.get("html"), base_dir)
-        log_path = _relative_path(files.get("powermetrics_log"), base_dir)
-        text_path = _relative_path(files.get("raw_text"), base_dir)
-        json_path = _relative_path(p, base_dir)
-
-        # Create screenshot if HTML exists
-        screenshot_path = None
-        if html_path and create_screenshots:
-            html_full_path = base_dir / html_path
-            screenshot_name = html_path.replace(".html", "_screenshot.png")
-            screenshot_full_path = base_dir / screenshot_name
-
-            # Create screenshot if it doesn't exist
-            if html_full_path.exists() and not screenshot_full_path.exists():
-                print(f"Creating screenshot for {html_path}...")
-                if create_screenshot(html_full_path, screenshot_full_path):
-                    screenshot_path = _relative_path(screenshot_full_path, base_dir)
-            elif screenshot_full_path.exists():
-                screenshot_path = _relative_path(screenshot_full_path, base_dir)
-
-        rec = {
-            "model": d.get("model"),
-            "timestamp": d.get("timestamp"),
-            "load_time_seconds": d.get("load_time_seconds"),
-            "generation_time_seconds": d.get("generation_time_seconds"),
-            "tokens_per_second": pick_tokens_per_sec(d),
-            "prompt_tokens": usage.get("prompt_tokens"),
-            "completion_tokens": usage.get("completion_tokens"),
-            "total_tokens": usage.get("total_tokens"),
-            "cpu_w_avg": (power.get("cpu_watts") or {}).get("avg"),
-            "cpu_w_max": (power.get("cpu_watts") or {}).get("max"),
-            "gpu_w_avg": gstats.get("avg"),
-            "gpu_w_max": gstats.get("max"),
-            "gpu_w_min": gstats.get("min"),
-            "ane_w_avg": (power.get("ane_watts") or {}).get("avg"),
-            "ane_w_max": (power.get("ane_watts") or {}).get("max"),
-            "samplers": power.get("samplers"),
-            "mem_after_load_lms": ((mem.get("delta_since_baseline_after_load") or {}).get("lmstudio_rss_bytes")),
-            "mem_after_gen_lms": ((mem.get("delta_since_baseline_after_generation") or {}).get("lmstudio_rss_bytes")),
-            "mem_after_gen_vs_load_lms": ((mem.get("delta_since_load_after_generation") or {}).get("lmstudio_rss_bytes")),
-            "mem_after_load_sys": ((mem.get("delta_since_baseline_after_load") or {}).get("system_used_bytes")),
-            "mem_after_gen_sys": ((mem.get("delta_since_baseline_after_generation") or {}).get("system_used_bytes")),
-            "errors": d.get("errors") or {},
-            "html_path": html_path,
-            "log_path": log_path,
-            "raw_json_path": json_path,
-            "raw_text_path": text_path,
-            "screenshot_path": screenshot_path,
-            "model_size": model_size,
-            "quantization": quant,
-            "settings": {
-                "temperature": prompt.get("temperature"),
-                "top_p": prompt.get("top_p"),
-                "max_tokens": prompt.get("max_tokens"),
-                "num_ctx": prompt.get("num_ctx"),
-                "gpu_setting": prompt.get("gpu_setting"),
-            },
-        }
-        records.append(rec)
+def _pretty_params(x):
+    try:
+        v = float(x)
+        if v >= 1e9:
+            return f"{v/1e9:.1f}B"
+        if v >= 1e6:
+            return f"{v/1e6:.1f}M"
+        return str(int(v))
+    except Exception:
+        return str(x) if x is not None else None
 
-    summary = {
-        "models": len(records),
-        "total_generation_time_seconds": total_gen_time,
-        "avg_generation_time_seconds": (total_gen_time/len(records) if records else None),
-        "machine": _machine_info(),
-    }
 
-    # Inline CSS and JS for a self-contained report
-    css = """
+_CSS = """
 body{font-family:system-ui,-apple-system,Segoe UI,Roboto,Ubuntu,'Helvetica Neue',Arial,'Noto Sans',sans-serif;line-height:1.35;margin:20px;color:#111}
 h1{margin:0 0 8px 0}
 .muted{color:#666}
@@ -259,17 +268,14 @@ code{background:#f8fafc;border:1px solid #e2e8f0;border-radius:4px;padding:1px 4
 .nowrap{white-space:nowrap}
 .cols{display:flex;flex-wrap:wrap;gap:10px;margin-top:6px}
 .cols label{display:flex;align-items:center;gap:6px;border:1px solid #e2e8f0;padding:4px 8px;border-radius:8px;background:#f8fafc}
-.hidden{display:none}
 .preview-container{position:relative}
+.preview-cell{padding:0;border:0;cursor:default}
 .preview-img{display:none;position:fixed;z-index:1000;border:2px solid #333;border-radius:8px;box-shadow:0 4px 12px rgba(0,0,0,0.3);max-width:600px;max-height:400px;pointer-events:none}
 tbody tr:hover .preview-img{display:block}
 """
 
-    # JS sorting/filtering and rendering
-    js = """
-const DATA = REPLACEME_DATA;
-const SUMMARY = REPLACEME_SUMMARY;
-
+# JS sorting/filtering and rendering
+_JS = """
 let sortKey = 'model';
 let sortDir = 1; // 1 asc, -1 desc
 
@@ -286,59 +292,77 @@ function formatBytes(b){
   return sign + v.toFixed(2)+' '+units[u];
 }
 
+// Lower-cased model names for the search filter, computed once instead of per keystroke
+for(const r of DATA){ r.modelLower = String(r.model).toLowerCase(); }
+
+// Sorted copy of DATA for the current sortKey/sortDir; typing in the search box reuses it
+let sortedRows = null;
+let sortedFor = null;
+
+function getSortedRows(){
+  const k = sortKey + '|' + sortDir;
+  if(sortedFor !== k){
+    sortedRows = DATA.slice().sort((a,b)=>{
+      const av=a[sortKey], bv=b[sortKey];
+      const an = num(av), bn = num(bv);
+      if(an!=null && bn!=null){ return (an-bn)*sortDir; }
+      return String(av||'').localeCompare(String(bv||''))*sortDir;
+    });
+    sortedFor = k;
+  }
+  return sortedRows;
+}
+
 function render(){
   const q = document.querySelector('#search').value.toLowerCase();
   const tbody = document.querySelector('#tbl tbody');
-  tbody.innerHTML='';
-  let rows = DATA.slice();
-  rows.sort((a,b)=>{
-    const av=a[sortKey], bv=b[sortKey];
-    const an = num(av), bn = num(bv);
-    if(an!=null && bn!=null){ return (an-bn)*sortDir; }
-    return String(av||'').localeCompare(String(bv||''))*sortDir;
-  });
+  const rows = getSortedRows();
+  const parts = [];
   for(const r of rows){
-    if(q && !(String(r.model).toLowerCase().includes(q))) continue;
-    const tr = document.createElement('tr');
-    tr.className = 'preview-container';
+    if(q && !r.modelLower.includes(q)) continue;
     const linkHtml = r.html_path ? `<a href=\"${r.html_url}\" target=\"_blank\">HTML</a>` : '<span class=\"muted\">n/a</span>';
     const linkText = r.raw_text_path ? `<a href=\"${r.text_url}\" target=\"_blank\">Text</a>` : '<span class=\"muted\">n/a</span>';
-    const screenshot_img = r.screenshot_url ? `<img src=\"${r.screenshot_url}\" class="preview-img" alt="Screenshot">` : '';
-    tr.innerHTML = `
-      <td class="col-model nowrap">${r.model || '-'}</td>
-      <td class="col-settings nowrap">${r.settings.gpu_setting?`<span class=\"tag\">gpu:${r.settings.gpu_setting}</span>`:''} <span class="tag">T=${r.settings.temperature ?? '-'}</span> <span class="tag">p=${r.settings.top_p ?? '-'}</span></td>
-      <td class="col-load_time_seconds">${r.load_time_seconds?.toFixed?.(2) ?? '-'}</td>
-      <td class="col-generation_time_seconds">${r.generation_time_seconds?.toFixed?.(2) ?? '-'}</td>
-      <td class="col-tokens_per_second">${r.tokens_per_second?.toFixed?.(2) ?? '-'}</td>
-      <td class="col-prompt_tokens">${r.prompt_tokens ?? '-'}</td>
-      <td class="col-completion_tokens">${r.completion_tokens ?? '-'}</td>
-      <td class="col-total_tokens">${r.total_tokens ?? '-'}</td>
-      <td class="col-model_size">${r.model_size ?? '-'}</td>
-      <td class="col-quantization">${r.quantization ?? '-'}</td>
-      <td class="col-cpu_w_avg">${r.cpu_w_avg?.toFixed?.(2) ?? '-'}</td>
-      <td class="col-gpu_w_avg">${r.gpu_w_avg?.toFixed?.(2) ?? '-'}</td>
-      <td class="col-gpu_w_max">${r.gpu_w_max?.toFixed?.(2) ?? '-'}</td>
-      <td class="col-gpu_w_min">${r.gpu_w_min?.toFixed?.(2) ?? '-'}</td>
-      <td class="col-ane_w_avg">${r.ane_w_avg?.toFixed?.(2) ?? '-'}</td>
-      <td class="col-mem_after_load_lms">${formatBytes(r.mem_after_load_lms)}</td>
-      <td class="col-mem_after_gen_lms">${formatBytes(r.mem_after_gen_lms)}</td>
-      <td class="col-timestamp">${r.timestamp ? new Date(r.timestamp).toLocaleString() : '-'}</td>
-      <td class=\"col-artifacts\">${linkHtml} · ${linkText} · <a href=\"${r.json_url}\" target=\"_blank\">JSON</a></td>
-      ${screenshot_img}
-    `;
-    if(r.screenshot_url){
-      const img = tr.querySelector('.preview-img');
-      tr.addEventListener('mousemove', (e)=>{
-        const x = e.clientX + 15;
-        const y = e.clientY + 15;
-        img.style.left = x + 'px';
-        img.style.top = y + 'px';
-      });
-    }
-    tbody.appendChild(tr);
+    // Own cell in every row, under its own empty header: a bare <img> directly in a <tr> would be moved out of
+    // the table by the HTML parser, and inside the artifacts cell it would vanish with that column
+    const screenshot_img = r.screenshot_url ? `<img data-src=\"${r.screenshot_url}\" class="preview-img" alt="Screenshot" loading="lazy" decoding="async">` : '';
+    parts.push(`<tr class="preview-container">
+      <td data-key="model" class="col-model nowrap">${r.model_html || '-'}</td>
+      <td data-key="settings" class="col-settings nowrap">${r.gpu_setting_html?`<span class=\"tag\">gpu:${r.gpu_setting_html}</span>`:''} <span class="tag">T=${r.settings.temperature ?? '-'}</span> <span class="tag">p=${r.settings.top_p ?? '-'}</span></td>
+      <td data-key="load_time_seconds" class="col-load_time_seconds">${r.load_time_seconds?.toFixed?.(2) ?? '-'}</td>
+      <td data-key="generation_time_seconds" class="col-generation_time_seconds">${r.generation_time_seconds?.toFixed?.(2) ?? '-'}</td>
+      <td data-key="tokens_per_second" class="col-tokens_per_second">${r.tokens_per_second?.toFixed?.(2) ?? '-'}</td>
+      <td data-key="prompt_tokens" class="col-prompt_tokens">${r.prompt_tokens ?? '-'}</td>
+      <td data-key="completion_tokens" class="col-completion_tokens">${r.completion_tokens ?? '-'}</td>
+      <td data-key="total_tokens" class="col-total_tokens">${r.total_tokens ?? '-'}</td>
+      <td data-key="model_size" class="col-model_size">${r.model_size_html ?? '-'}</td>
+      <td data-key="quantization" class="col-quantization">${r.quantization_html ?? '-'}</td>
+      <td data-key="cpu_w_avg" class="col-cpu_w_avg">${r.cpu_w_avg?.toFixed?.(2) ?? '-'}</td>
+      <td data-key="gpu_w_avg" class="col-gpu_w_avg">${r.gpu_w_avg?.toFixed?.(2) ?? '-'}</td>
+      <td data-key="gpu_w_max" class="col-gpu_w_max">${r.gpu_w_max?.toFixed?.(2) ?? '-'}</td>
+      <td data-key="gpu_w_min" class="col-gpu_w_min">${r.gpu_w_min?.toFixed?.(2) ?? '-'}</td>
+      <td data-key="ane_w_avg" class="col-ane_w_avg">${r.ane_w_avg?.toFixed?.(2) ?? '-'}</td>
+      <td data-key="mem_after_load_lms" class="col-mem_after_load_lms">${formatBytes(r.mem_after_load_lms)}</td>
+      <td data-key="mem_after_gen_lms" class="col-mem_after_gen_lms">${formatBytes(r.mem_after_gen_lms)}</td>
+      <td data-key="timestamp" class="col-timestamp">${r.timestamp ? new Date(r.timestamp).toLocaleString() : '-'}</td>
+      <td data-key=\"artifacts\" class=\"col-artifacts\">${linkHtml} · ${linkText} · <a href=\"${r.json_url}\" target=\"_blank\">JSON</a></td>
+      <td class="preview-cell">${screenshot_img}</td>
+    </tr>`);
   }
+  // One parse for the whole body instead of an appendChild per row
+  tbody.innerHTML = parts.join('');
   document.querySelector('#count').textContent = rows.length;
-  applyColumnVisibility();
+}
+
+function setupPreview(){
+  // Delegated: one listener on tbody keeps the hovered row's screenshot next to the cursor
+  document.querySelector('#tbl tbody').addEventListener('mousemove', (e)=>{
+    const tr = e.target.closest('tr');
+    const img = tr && tr.querySelector('.preview-img');
+    if(!img) return;
+    if(!img.hasAttribute('src')) img.src = img.dataset.src;  // screenshots load on first hover, not with the page
+    img.style.left = (e.clientX + 15) + 'px';
+    img.style.top = (e.clientY + 15) + 'px';
+  });
 }
 
 function setupSort(){
@@ -352,46 +376,44 @@ function setupSort(){
   });
 }
 const DEFAULT_HIDDEN = new Set(["timestamp","settings","total_tokens","cpu_w_avg","ane_w_avg"]);
+let colChecks = []; // filled once by setupColumnToggles
 
 function setupColumnToggles(){
   const wrapper = document.querySelector('#col-toggles');
   const cols = Array.from(document.querySelectorAll('#tbl th')).map(th=>({ key: th.dataset.key, label: th.textContent }));
+  // Labels are collected off-document and inserted in one go
+  const frag = document.createDocumentFragment();
   for(const c of cols){
     if(!c.key) continue;
     const id = `col_${c.key}`;
     const checked = !DEFAULT_HIDDEN.has(c.key);
     const lab = document.createElement('label');
     lab.innerHTML = `<input type="checkbox" id="${id}" ${checked?'checked':''}> ${c.label}`;
-    wrapper.appendChild(lab);
-    lab.querySelector('input').addEventListener('change', applyColumnVisibility);
+    frag.appendChild(lab);
+    const input = lab.querySelector('input');
+    colChecks.push(input);
+    input.addEventListener('change', applyColumnVisibility);
   }
+  wrapper.appendChild(frag);
   applyColumnVisibility();
 }
 
 function applyColumnVisibility(){
-  const checks = Array.from(document.querySelectorAll('#col-toggles input[type="checkbox"]'));
-  const visible = new Set(checks.filter(c=>c.checked).map(c=>c.id.replace('col_','')));
-  const controllable = new Set(Array.from(checks).map(c=>c.id.replace('col_','')));
-  document.querySelectorAll('#tbl th').forEach(th=>{
-    const key = th.dataset.key;
-    if(!key) return;
-    th.classList.toggle('hidden', !visible.has(key));
-  });
-  document.querySelectorAll('#tbl tbody tr').forEach(tr=>{
-    Array.from(tr.children).forEach(td=>{
-      const m = td.className.match(/col-([A-Za-z0-9_.-]+)/);
-      if(!m) return;
-      const key = m[1];
-      if(!controllable.has(key)) return;
-      td.classList.toggle('hidden', !visible.has(key));
-    });
-  });
+  // One stylesheet swap hides whole columns, including rows rendered later; cells are never touched
+  const hidden = colChecks.filter(c=>!c.checked).map(c=>c.id.slice(4));
+  document.getElementById('col_hide').textContent = hidden.map(k=>`#tbl [data-key="${k}"]{display:none}`).join('');
 }
 
 window.addEventListener('DOMContentLoaded',()=>{
   setupSort();
+  setupPreview();
   setupColumnToggles();
-  document.querySelector('#search').addEventListener('input', render);
+  // Debounced: a burst of keystrokes renders once
+  let searchTimer = 0;
+  document.querySelector('#search').addEventListener('input', ()=>{
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(render, 80);
+  });
   // Fill summary
   if(SUMMARY){
     const el = document.querySelector('#summary');
@@ -412,14 +434,21 @@ function drawScatterTPSvsGPU(){
   const canvas = document.getElementById('chart_tps_gpu');
   if(!canvas) return;
   const ctx = canvas.getContext('2d');
-  const data = DATA.filter(d=> num(d.tokens_per_second)!=null && num(d.gpu_w_avg)!=null);
+  // One pass: coordinates into typed arrays with running bounds (no Math.min/max spread over all points)
+  const xs = new Float64Array(DATA.length), ys = new Float64Array(DATA.length), labels = [];
+  let n = 0, xMin = Infinity, xMax = -Infinity, yTop = -Infinity;
+  for(const d of DATA){
+    const x = num(d.gpu_w_avg), y = num(d.tokens_per_second);
+    if(x==null || y==null) continue;
+    xs[n] = x; ys[n] = y; labels.push(String(d.model).slice(0, 18)); n++;
+    if(x < xMin) xMin = x;
+    if(x > xMax) xMax = x;
+    if(y > yTop) yTop = y;
+  }
   const pad = 40; const W = canvas.width, H = canvas.height;
   ctx.clearRect(0,0,W,H);
-  if(data.length===0){ ctx.fillText('No data for TPS vs GPU (avg W)', 10, 20); return; }
-  const xs = data.map(d=>num(d.gpu_w_avg));
-  const ys = data.map(d=>num(d.tokens_per_second));
-  const xMin = Math.min(...xs), xMax = Math.max(...xs);
-  const yMin = 0, yMax = Math.max(...ys)*1.1;
+  if(n===0){ ctx.fillText('No data for TPS vs GPU (avg W)', 10, 20); return; }
+  const yMin = 0, yMax = yTop*1.1;
   const xScale = v => pad + (W-2*pad) * ((v - xMin) / (xMax - xMin || 1));
   const yScale = v => H - pad - (H-2*pad) * ((v - yMin) / (yMax - yMin || 1));
   // axes
@@ -428,20 +457,18 @@ function drawScatterTPSvsGPU(){
   ctx.fillStyle = '#333'; ctx.font = '12px system-ui';
   ctx.fillText('GPU avg W', W/2 - 30, H - 10);
   ctx.save(); ctx.translate(12, H/2); ctx.rotate(-Math.PI/2); ctx.fillText('Tokens/sec', 0, 0); ctx.restore();
-  // points
-  for(const d of data){
-    const x = xScale(num(d.gpu_w_avg));
-    const y = yScale(num(d.tokens_per_second));
-    ctx.fillStyle = '#2563eb';
-    ctx.beginPath(); ctx.arc(x, y, 4, 0, Math.PI*2); ctx.fill();
+  // points: all circles in one path, filled once
+  const dots = new Path2D();
+  for(let i=0;i<n;i++){
+    const x = xScale(xs[i]), y = yScale(ys[i]);
+    dots.moveTo(x+4, y); dots.arc(x, y, 4, 0, Math.PI*2);
   }
+  ctx.fillStyle = '#2563eb';
+  ctx.fill(dots);
   // labels (truncated)
   ctx.fillStyle = '#555';
-  for(const d of data){
-    const x = xScale(num(d.gpu_w_avg));
-    const y = yScale(num(d.tokens_per_second));
-    const label = String(d.model).slice(0, 18);
-    ctx.fillText(label, x+6, y-6);
+  for(let i=0;i<n;i++){
+    ctx.fillText(labels[i], xScale(xs[i])+6, yScale(ys[i])-6);
   }
 }
 
@@ -449,58 +476,53 @@ function drawBarsTimes(){
   const canvas = document.getElementById('chart_times');
   if(!canvas) return;
   const ctx = canvas.getContext('2d');
-  const data = DATA.filter(d=> num(d.generation_time_seconds)!=null).slice().sort((a,b)=>num(b.generation_time_seconds)-num(a.generation_time_seconds)).slice(0,20);
+  // Convert each time once, then keep the 20 slowest
+  const data = [];
+  for(const d of DATA){
+    const t = num(d.generation_time_seconds);
+    if(t!=null) data.push({model: d.model, t});
+  }
+  data.sort((a,b)=>b.t-a.t);
+  data.length = Math.min(data.length, 20);
   const pad = 60; const W = canvas.width, H = canvas.height;
   ctx.clearRect(0,0,W,H);
   if(data.length===0){ ctx.fillText('No generation time data', 10, 20); return; }
-  const xs = data.map(d=>num(d.generation_time_seconds));
-  const xMax = Math.max(...xs) * 1.1; const xMin = 0;
+  const xMax = data[0].t * 1.1; const xMin = 0;
   const barH = (H-2*pad) / data.length;
   const xScale = v => pad + (W-2*pad) * ((v - xMin) / (xMax - xMin || 1));
   // axes
   ctx.strokeStyle = '#ccc'; ctx.beginPath(); ctx.moveTo(pad, pad); ctx.lineTo(pad, H-pad); ctx.lineTo(W-pad, H-pad); ctx.stroke();
   ctx.fillStyle = '#333'; ctx.font = '12px system-ui'; ctx.fillText('Generation time (s)', W/2 - 50, H - 10);
-  // bars
+  // bars: one path and one fill, then the labels on top with a single fillStyle
+  ctx.beginPath();
+  data.forEach((d,i)=>{ ctx.rect(pad, pad + i*barH + 2, xScale(d.t) - pad, barH-4); });
+  ctx.fillStyle = '#10b981';
+  ctx.fill();
+  ctx.fillStyle = '#111';
   data.forEach((d,i)=>{
     const y = pad + i*barH + 2;
-    const w = xScale(num(d.generation_time_seconds)) - pad;
-    ctx.fillStyle = '#10b981';
-    ctx.fillRect(pad, y, w, barH-4);
-    ctx.fillStyle = '#111';
-    const label = `${String(d.model).slice(0,18)}  ${num(d.generation_time_seconds).toFixed(1)}s`;
-    ctx.fillText(label, pad+4, y + barH/2 + 4);
+    ctx.fillText(`${String(d.model).slice(0,18)}  ${d.t.toFixed(1)}s`, pad+4, y + barH/2 + 4);
   });
 }
 """
 
-    # Compute file URLs
-    for r in records:
-        r["html_url"] = _relative_href(r.get("html_path"))
-        r["log_url"] = _relative_href(r.get("log_path"))
-        r["json_url"] = _relative_href(r.get("raw_json_path"))
-        r["text_url"] = _relative_href(r.get("raw_text_path"))
-        r["screenshot_url"] = _relative_href(r.get("screenshot_path"))
-
-    # Build HTML doc
-    data_json = json.dumps(records)
-    summary_json = json.dumps(summary)
-    prompt_html = (f"<pre style='white-space:pre-wrap'>{(prompt_text or 'Not available')}</pre>")
-    html = f"""
+_PAGE_HEAD = PageTemplate("""
 <!doctype html>
 <html>
 <head>
   <meta charset="utf-8">
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <title>{title}</title>
-  <style>{css}</style>
+  <title>$TITLE</title>
+  <style>$CSS</style>
+  <style id="col_hide"></style>
 </head>
 <body>
-  <h1>{title}</h1>
-  <div class="muted small">Generated from {len(records)} result files.</div>
+  <h1>$TITLE</h1>
+  <div class="muted small">Generated from $COUNT result files.</div>
   <details>
     <summary><strong>Prompt, Machine & Run Info</strong> (click to expand)</summary>
     <div id="summary" style="margin:8px 0"></div>
-    {prompt_html}
+    $PROMPT_HTML
   </details>
   <div class="toolbar">
     <input id="search" type="search" placeholder="Filter by model name">
@@ -529,6 +551,7 @@ function drawBarsTimes(){
         <th class="col-mem_after_gen_lms" data-key="mem_after_gen_lms">LM RSS Δ gen</th>
         <th class="col-timestamp" data-key="timestamp">Timestamp</th>
         <th class="col-artifacts" data-key="artifacts">Artifacts</th>
+        <th class="preview-cell"></th>
       </tr>
     </thead>
     <tbody></tbody>
@@ -544,13 +567,159 @@ function drawBarsTimes(){
     <canvas id="chart_times" width="900" height="480" style="width:100%;max-width:100%;"></canvas>
   </div>
 
-  <script>
-  {js.replace('REPLACEME_DATA', data_json).replace('REPLACEME_SUMMARY', summary_json)}
-  </script>
-</body>
-</html>
+  <script type="application/json" id="report_data">{"records":""")
+
+_REPORT_DATA_JS = """const REPORT = JSON.parse(document.getElementById('report_data').textContent);
+  const DATA = REPORT.records;
+  const SUMMARY = REPORT.summary;
 """
-    return html
+
+# Everything after the summary JSON is constant: joined and encoded once
+_PAGE_TAIL = ("}</script>\n  <script>\n  " + _REPORT_DATA_JS + _JS + "\n  </script>\n</body>\n</html>\n").encode("utf-8")
+
+
+def build_html_parts(rows, title="LM Studio Bench Report", prompt_text=None, out_path: Path = None, create_screenshots: bool = True):
+    # Prepare normalized rows for the table
+    cwd = Path.cwd()
+    base_dir = (out_path.parent if out_path else cwd).resolve()
+    records = []
+    records_append = records.append
+    pending_shots = []  # (record index, html path, screenshot path)
+    total_gen_time = 0.0
+    for p, d in rows:
+        g = d.get  # bound once per row; used for every top-level field below
+        files = g("files") or _NO_DICT
+        power = g("power") or _NO_DICT
+        mem = g("memory") or _NO_DICT
+        usage = g("usage") or _NO_DICT
+        prompt = g("prompt") or _NO_DICT
+        prompt_text_in_json = g("prompt_text") or prompt.get("text")
+        if prompt_text is None:
+            prompt_text = prompt_text_in_json
+        mi = g("model_info") or _NO_DICT
+        rt = g("runtime") or _NO_DICT
+        params = mi.get("parameters") or mi.get("n_params") or mi.get("params") or rt.get("n_params")
+        quant = mi.get("quantization") or mi.get("quant") or rt.get("quantization") or rt.get("q_type")
+        model_size = _pretty_params(params)
+        cstats = power.get("cpu_watts") or _NO_DICT
+        gstats = power.get("gpu_watts") or _NO_DICT
+        astats = power.get("ane_watts") or _NO_DICT
+        mem_load = mem.get("delta_since_baseline_after_load") or _NO_DICT
+        mem_gen = mem.get("delta_since_baseline_after_generation") or _NO_DICT
+        mem_gen_vs_load = mem.get("delta_since_load_after_generation") or _NO_DICT
+        model = g("model")
+        gpu_setting = prompt.get("gpu_setting")
+        gen_time = g("generation_time_seconds")
+        if isinstance(gen_time, (int, float)):
+            total_gen_time += gen_time
+        html_path = _relative_path(files.get("html"), base_dir)
+        log_path = _relative_path(files.get("powermetrics_log"), base_dir)
+        text_path = _relative_path(files.get("raw_text"), base_dir)
+        # Row paths are relative to the working directory (not the report) unless already absolute
+        json_path = _relative_path(p if Path(p).is_absolute() else cwd / p, base_dir)
+
+        # Create screenshot if HTML exists
+        screenshot_path = preview_path = None
+        if html_path and create_screenshots:
+            html_full_path = base_dir / html_path
+            screenshot_name = html_path.replace(".html", "_screenshot.png")
+            screenshot_full_path = base_dir / screenshot_name
+
+            # Create screenshot if it doesn't exist (all missing ones in one browser session after the loop)
+            if screenshot_full_path.exists():
+                screenshot_path = _relative_path(screenshot_full_path, base_dir)
+                preview_path = _relative_path(preview_image(screenshot_full_path), base_dir)
+            elif html_full_path.exists():
+                print(f"Creating screenshot for {html_path}...")
+                pending_shots.append((len(records), html_full_path, screenshot_full_path))
+
+        records_append({
+            "model": model,
+            "model_html": _html_text(model),
+            "timestamp": g("timestamp"),
+            "load_time_seconds": g("load_time_seconds"),
+            "generation_time_seconds": gen_time,
+            "tokens_per_second": pick_tokens_per_sec(d),
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "total_tokens": usage.get("total_tokens"),
+            "cpu_w_avg": cstats.get("avg"),
+            "cpu_w_max": cstats.get("max"),
+            "gpu_w_avg": gstats.get("avg"),
+            "gpu_w_max": gstats.get("max"),
+            "gpu_w_min": gstats.get("min"),
+            "ane_w_avg": astats.get("avg"),
+            "ane_w_max": astats.get("max"),
+            "samplers": power.get("samplers"),
+            "mem_after_load_lms": mem_load.get("lmstudio_rss_bytes"),
+            "mem_after_gen_lms": mem_gen.get("lmstudio_rss_bytes"),
+            "mem_after_gen_vs_load_lms": mem_gen_vs_load.get("lmstudio_rss_bytes"),
+            "mem_after_load_sys": mem_load.get("system_used_bytes"),
+            "mem_after_gen_sys": mem_gen.get("system_used_bytes"),
+            "errors": g("errors") or {},
+            "html_path": html_path,
+            "log_path": log_path,
+            "raw_json_path": json_path,
+            "raw_text_path": text_path,
+            "screenshot_path": screenshot_path,
+            "model_size": model_size,
+            "quantization": quant,
+            "model_size_html": _html_text(model_size),
+            "quantization_html": _html_text(quant),
+            "gpu_setting_html": _html_text(gpu_setting),
+            "settings": {
+                "temperature": prompt.get("temperature"),
+                "top_p": prompt.get("top_p"),
+                "max_tokens": prompt.get("max_tokens"),
+                "num_ctx": prompt.get("num_ctx"),
+                "gpu_setting": gpu_setting,
+            },
+            # File URLs for the links in the table
+            "html_url": _relative_href(html_path),
+            "log_url": _relative_href(log_path),
+            "json_url": _relative_href(json_path),
+            "text_url": _relative_href(text_path),
+            "screenshot_url": _relative_href(preview_path),
+        })
+
+    if pending_shots:
+        done = create_screenshots_batch([(html, png) for _, html, png in pending_shots])
+        for (i, _, png), ok in zip(pending_shots, done):
+            if ok:
+                rec = records[i]
+                rec["screenshot_path"] = _relative_path(png, base_dir)
+                rec["screenshot_url"] = _relative_href(_relative_path(preview_image(png), base_dir))
+
+    summary = {
+        "models": len(records),
+        "total_generation_time_seconds": total_gen_time,
+        "avg_generation_time_seconds": (total_gen_time/len(records) if records else None),
+        "machine": _machine_info(),
+    }
+
+    # Build HTML doc
+    # Data is placed into the script as its own (bytes) chunk, never scanned by str.replace
+    data_json = json_script_bytes(records)
+    summary_json = json_script_bytes(summary)
+    prompt_html = (f"<pre style='white-space:pre-wrap'>{(prompt_text or 'Not available')}</pre>")
+    html = _PAGE_HEAD.substitute(TITLE=title, CSS=_CSS, COUNT=len(records), PROMPT_HTML=prompt_html)
+    # Data ships as a JSON block read with JSON.parse, which is much cheaper for the browser than
+    # compiling the same data as a JS object literal. Kept as separate chunks so the (possibly large)
+    # JSON is never copied into one more string
+    return [html, data_json, b',"summary":', summary_json, _PAGE_TAIL]
+
+
+def build_html(rows, title="LM Studio Bench Report", prompt_text=None, out_path: Path = None, create_screenshots: bool = True):
+    parts = build_html_parts(rows, title=title, prompt_text=prompt_text, out_path=out_path, create_screenshots=create_screenshots)
+    return "".join(c.decode("utf-8") if isinstance(c, bytes) else c for c in parts)
+
+
+def write_html(out: Path, parts):
+    # Encode chunk by chunk instead of materializing the whole document as str and bytes;
+    # the JSON chunks already arrive as bytes
+    with open(out, "wb") as f:
+        for chunk in parts:
+            f.write(chunk if isinstance(chunk, bytes) else chunk.encode("utf-8"))
 
 
 def main():
@@ -572,8 +741,8 @@ def main():
             pass
 
     rows = load_results(folder)
-    html = build_html(rows, title=args.title, prompt_text=prompt_text, out_path=out, create_screenshots=not args.no_screenshots)
-    out.write_text(html)
+    parts = build_html_parts(rows, title=args.title, prompt_text=prompt_text, out_path=out, create_screenshots=not args.no_screenshots)
+    write_html(out, parts)
     display_out = _relative_path(out, Path.cwd()) or out.as_posix()
     print(f"Wrote report: {display_out}")
 
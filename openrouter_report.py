@@ -1,11 +1,167 @@
 #!/usr/bin/env python3
+import hashlib
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from html import escape
 import subprocess
 import sys
-
-HTML_TEMPLATE = """
+import threading
+import time
+from report_common import (PageTemplate, create_screenshots_batch, json_dumps, json_loads, json_script_bytes,
+                           preview_image, read_bytes)
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+if msgspec is not None:
+    from typing import Any, Optional
+
+    # Only the keys get_report_data reads, down to the nested ones; every other field (e.g. the full
+    # usage breakdown) is skipped by the decoder instead of being built. UNSET keeps absent keys absent
+    # in the dict returned by to_builtins, so the .get() chains behave exactly as on a full parse.
+    class _Derived(msgspec.Struct):
+        tokens_per_second: Any = msgspec.UNSET
+
+    class _Usage(msgspec.Struct):
+        prompt_tokens: Any = msgspec.UNSET
+        completion_tokens: Any = msgspec.UNSET
+
+    class _Files(msgspec.Struct):
+        html: Any = msgspec.UNSET
+
+    class _Prompt(msgspec.Struct):
+        text: Any = msgspec.UNSET
+
+    class _ReportFields(msgspec.Struct):
+        timestamp: Any = msgspec.UNSET
+        model: Any = msgspec.UNSET
+        generation_time_seconds: Any = msgspec.UNSET
+        derived: Optional[_Derived] = msgspec.UNSET
+        cost: Any = msgspec.UNSET
+        usage: Optional[_Usage] = msgspec.UNSET
+        files: Optional[_Files] = msgspec.UNSET
+        prompt: Optional[_Prompt] = msgspec.UNSET
+
+    _report_fields_decoder = msgspec.json.Decoder(_ReportFields)
+
+def _decode_result(raw: bytes):
+    if msgspec is not None:
+        try:
+            return msgspec.to_builtins(_report_fields_decoder.decode(raw))
+        except msgspec.MsgspecError:
+            pass  # malformed or unexpected shape: the generic decoder gives the usual result/JSONDecodeError
+    return json_loads(raw)
+
+def _scan_dir(folder: Path):
+    # One scandir pass for the sorted result JSON paths and the set of every name in the folder, so the
+    # html/screenshot checks in get_report_data are set lookups instead of an exists() stat each.
+    # DirEntry caches the type, so no extra stat per entry
+    names, json_names = set(), []
+    try:
+        with os.scandir(folder) as it:
+            for e in it:
+                names.add(e.name)
+                # dot files are our own (e.g. the parse cache), never results
+                if e.name.endswith(".json") and not e.name.startswith(".") and e.is_file():
+                    json_names.append(e.name)
+    except FileNotFoundError:
+        return [], names
+    return [folder / name for name in sorted(json_names)], names
+
+# Parsed result files by path, with the (mtime_ns, size) they were read at
+_parsed_results = {}
+
+def _load_result(json_file: Path):
+    st = json_file.stat()
+    key = str(json_file)
+    cached = _parsed_results.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    data = _decode_result(read_bytes(json_file))
+    _parsed_results[key] = (st.st_mtime_ns, st.st_size, data)
+    return data
+
+def _try_load_result(json_file: Path):
+    try:
+        return _load_result(json_file)
+    except Exception as e:
+        return e  # re-raised by the caller, in file order
+
+# On-disk copy of _parsed_results per results dir, so a fresh process (e.g. a manual re-run) skips
+# unchanged files too. Entries are checked against mtime/size like the in-memory ones. Plain JSON, never
+# pickle: results folders get copied and shared, and loading the cache must not be able to run code.
+REPORT_CACHE_NAME = ".report_cache.json"
+_REPORT_CACHE_VERSION = 1
+# Content hash of the last written index.html, see update_report
+REPORT_HASH_NAME = ".report.hash"
+_disk_cache_loaded = set()
+
+def _load_disk_cache(results_dir: Path):
+    key = str(results_dir)
+    if key in _disk_cache_loaded:
+        return
+    _disk_cache_loaded.add(key)
+    try:
+        cache = json_loads(read_bytes(results_dir / REPORT_CACHE_NAME))
+        if cache.get("version") != _REPORT_CACHE_VERSION:
+            return
+        for name, entry in cache["files"].items():
+            # [mtime_ns, size, parsed result]; anything else is ignored and that file parsed normally
+            if (isinstance(entry, list) and len(entry) == 3 and isinstance(entry[0], int)
+                    and isinstance(entry[1], int) and isinstance(entry[2], dict)):
+                _parsed_results.setdefault(str(results_dir / name), tuple(entry))
+    except Exception:
+        pass  # missing or unreadable cache: everything is parsed normally
+
+def _save_disk_cache(results_dir: Path, json_files):
+    files = {}
+    for json_file in json_files:
+        entry = _parsed_results.get(str(json_file))
+        if entry is not None:
+            files[json_file.name] = entry
+    tmp = results_dir / (REPORT_CACHE_NAME + ".tmp")
+    try:
+        cache = {"version": _REPORT_CACHE_VERSION, "files": files}
+        tmp.write_bytes(json_dumps(cache))
+        os.replace(tmp, results_dir / REPORT_CACHE_NAME)
+    except Exception:
+        pass
+
+def _load_results(json_files):
+    # Cached files cost one stat; only new or changed ones are read and parsed, overlapped in a pool
+    loaded = {}
+    stale = []
+    for json_file in json_files:
+        try:
+            st = json_file.stat()
+        except OSError as e:
+            loaded[json_file] = e
+            continue
+        cached = _parsed_results.get(str(json_file))
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            loaded[json_file] = cached[2]
+        else:
+            stale.append(json_file)
+    if stale:
+        with ThreadPoolExecutor(max_workers=min(32, len(stale)), thread_name_prefix="load_results") as ex:
+            loaded.update(zip(stale, ex.map(_try_load_result, stale)))
+    return loaded, bool(stale)
+
+def remember_result(json_file: Path, data):
+    # For a result the caller just wrote: keep its dict so the next report skips re-reading the file
+    st = Path(json_file).stat()
+    _parsed_results[str(json_file)] = (st.st_mtime_ns, st.st_size, data)
+
+HTML_TEMPLATE = PageTemplate("""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -14,29 +170,29 @@ HTML_TEMPLATE = """
     <title>OpenRouter Benchmark Report</title>
     <script src="https://cdn.tailwindcss.com"></script>
     <style>
-        body {{ font-family: sans-serif; }}
-        .table-container {{ margin: 20px; }}
-        table {{ width: 100%; border-collapse: collapse; }}
-        th, td {{ padding: 8px 12px; border: 1px solid #ddd; text-align: left; }}
-        th {{
+        body { font-family: sans-serif; }
+        .table-container { margin: 20px; }
+        table { width: 100%; border-collapse: collapse; }
+        th, td { padding: 8px 12px; border: 1px solid #ddd; text-align: left; }
+        th {
             background-color: #f4f4f4;
             cursor: pointer;
             user-select: none;
             position: relative;
-        }}
-        th:hover {{ background-color: #e8e8e8; }}
-        th.sorted-asc::after {{
+        }
+        th:hover { background-color: #e8e8e8; }
+        th.sorted-asc::after {
             content: ' ▲';
             font-size: 0.8em;
-        }}
-        th.sorted-desc::after {{
+        }
+        th.sorted-desc::after {
             content: ' ▼';
             font-size: 0.8em;
-        }}
-        .preview-container {{
+        }
+        .preview-container {
             position: relative;
-        }}
-        .preview-img {{
+        }
+        .preview-img {
             display: none;
             position: fixed;
             z-index: 1000;
@@ -46,10 +202,10 @@ HTML_TEMPLATE = """
             max-width: 600px;
             max-height: 400px;
             pointer-events: none;
-        }}
-        tbody tr:hover .preview-img {{
+        }
+        tbody tr:hover .preview-img {
             display: block;
-        }}
+        }
     </style>
 </head>
 <body class="bg-gray-50">
@@ -60,155 +216,164 @@ HTML_TEMPLATE = """
                 Prompt (click to expand)
             </summary>
             <div class="mt-2 p-4 bg-gray-50 border rounded-md">
-                <pre class="whitespace-pre-wrap">{PROMPT}</pre>
+                <pre class="whitespace-pre-wrap">$PROMPT</pre>
             </div>
         </details>
         <div id="report-table" class="overflow-x-auto">
-            {TABLE_CONTENT}
+            $TABLE_CONTENT
         </div>
-        <p class="text-sm text-gray-500 mt-4">Last updated: {TIMESTAMP}</p>
+        <p class="text-sm text-gray-500 mt-4">Last updated: $TIMESTAMP</p>
     </div>
     <script>
-        const DATA = {DATA_JSON};
+        const DATA = $DATA_JSON;
         let sortKey = null;
         let sortDir = 1; // 1 = ascending, -1 = descending
 
-        function parseNumber(val) {{
+        function parseNumber(val) {
             if (val === null || val === undefined || val === 'N/A' || val === '') return null;
             const num = parseFloat(val);
             return isNaN(num) ? null : num;
-        }}
+        }
 
-        function compareValues(a, b, key) {{
+        function compareValues(a, b, key) {
             const aVal = a[key];
             const bVal = b[key];
 
             const aNum = parseNumber(aVal);
             const bNum = parseNumber(bVal);
 
-            if (aNum !== null && bNum !== null) {{
+            if (aNum !== null && bNum !== null) {
                 return (aNum - bNum) * sortDir;
-            }}
+            }
 
             const aStr = String(aVal || '');
             const bStr = String(bVal || '');
             return aStr.localeCompare(bStr) * sortDir;
-        }}
+        }
 
-        function renderTable() {{
+        function renderTable() {
+            // Only runs on a sort click: the initial rows come pre-rendered from the server
             const tbody = document.querySelector('#data-table tbody');
-            tbody.innerHTML = '';
 
             let sortedData = [...DATA];
-            if (sortKey) {{
+            if (sortKey) {
                 sortedData.sort((a, b) => compareValues(a, b, sortKey));
-            }}
+            }
 
-            for (const row of sortedData) {{
-                const tr = document.createElement('tr');
-                tr.className = 'border-t preview-container';
-
-                const timestamp = row.timestamp ? new Date(row.timestamp).toLocaleString() : 'N/A';
-                const time_s = row.generation_time_seconds !== null ? row.generation_time_seconds.toFixed(2) : 'N/A';
-                const tps = row.tokens_per_second !== null ? row.tokens_per_second.toFixed(2) : 'N/A';
-                const cost = row.cost !== null ? row.cost.toFixed(4) : 'N/A';
+            // Build every row as one string and write the tbody once: a single parse and layout
+            const rows = [];
+            for (const row of sortedData) {
+                // Text from result files is inserted through the *_html fields, escaped by get_report_data
                 const html_link = row.html_file ?
-                    `<a href="${{row.html_file}}" target="_blank" class="text-blue-600 hover:underline">View</a>` : 'N/A';
+                    `<a href="${row.html_file_html}" target="_blank" class="text-blue-600 hover:underline">View</a>` : 'N/A';
 
                 const screenshot_img = row.screenshot_file ?
-                    `<img src="${{row.screenshot_file}}" class="preview-img" alt="Screenshot">` : '';
-
-                tr.innerHTML = `
-                    <td class="border px-4 py-2">${{row.model || 'N/A'}}</td>
-                    <td class="border px-4 py-2">${{time_s}}</td>
-                    <td class="border px-4 py-2">${{tps}}</td>
-                    <td class="border px-4 py-2">${{cost}}</td>
-                    <td class="border px-4 py-2">${{row.prompt_tokens || 0}}</td>
-                    <td class="border px-4 py-2">${{row.completion_tokens || 0}}</td>
-                    <td class="border px-4 py-2">${{timestamp}}</td>
-                    <td class="border px-4 py-2">${{html_link}}</td>
-                    ${{screenshot_img}}
-                `;
-
-                // Position screenshot on hover
-                if (row.screenshot_file) {{
-                    const img = tr.querySelector('.preview-img');
-                    tr.addEventListener('mousemove', (e) => {{
-                        const x = e.clientX + 15;
-                        const y = e.clientY + 15;
-                        img.style.left = x + 'px';
-                        img.style.top = y + 'px';
-                    }});
-                }}
-
-                tbody.appendChild(tr);
-            }}
+                    `<img data-src="${row.screenshot_html}" class="preview-img" alt="Screenshot" loading="lazy" decoding="async">` : '';
+
+                rows.push(`<tr class="border-t preview-container">
+                    <td class="border px-4 py-2">${row.model_html}</td>
+                    <td class="border px-4 py-2">${row.time_s_fmt}</td>
+                    <td class="border px-4 py-2">${row.tps_fmt}</td>
+                    <td class="border px-4 py-2">${row.cost_fmt}</td>
+                    <td class="border px-4 py-2">${row.prompt_tokens || 0}</td>
+                    <td class="border px-4 py-2">${row.completion_tokens || 0}</td>
+                    <td class="border px-4 py-2">${row.ts_fmt}</td>
+                    <td class="border px-4 py-2">${html_link}${screenshot_img}</td>
+                </tr>`);
+            }
+            tbody.innerHTML = rows.join('');
 
             // Update header sort indicators
-            document.querySelectorAll('#data-table th').forEach(th => {{
+            document.querySelectorAll('#data-table th').forEach(th => {
                 th.classList.remove('sorted-asc', 'sorted-desc');
-                if (th.dataset.key === sortKey) {{
+                if (th.dataset.key === sortKey) {
                     th.classList.add(sortDir === 1 ? 'sorted-asc' : 'sorted-desc');
-                }}
-            }});
-        }}
+                }
+            });
+        }
 
-        function setupSorting() {{
-            document.querySelectorAll('#data-table th').forEach(th => {{
-                th.addEventListener('click', () => {{
+        function setupPreview() {
+            // One listener on tbody positions the screenshot of whichever row is hovered,
+            // for the server-rendered rows and for rows rebuilt after sorting alike
+            const tbody = document.querySelector('#data-table tbody');
+            if (!tbody) return;
+            tbody.addEventListener('mousemove', (e) => {
+                const tr = e.target.closest('tr');
+                const img = tr && tr.querySelector('.preview-img');
+                if (!img) return;
+                if (!img.hasAttribute('src')) img.src = img.dataset.src;  // load the screenshot on first hover only
+                img.style.left = (e.clientX + 15) + 'px';
+                img.style.top = (e.clientY + 15) + 'px';
+            });
+        }
+
+        function setupSorting() {
+            document.querySelectorAll('#data-table th').forEach(th => {
+                th.addEventListener('click', () => {
                     const key = th.dataset.key;
                     if (!key) return;
 
-                    if (sortKey === key) {{
+                    if (sortKey === key) {
                         sortDir *= -1;
-                    }} else {{
+                    } else {
                         sortKey = key;
                         sortDir = 1;
-                    }}
+                    }
 
                     renderTable();
-                }});
-            }});
-        }}
+                });
+            });
+        }
 
-        window.addEventListener('DOMContentLoaded', () => {{
+        window.addEventListener('DOMContentLoaded', () => {
             setupSorting();
-            renderTable();
-        }});
+            setupPreview();
+        });
     </script>
 </body>
 </html>
-"""
+""")
 
-def create_screenshot(html_path: Path, screenshot_path: Path) -> bool:
-    """Create a screenshot of an HTML file using playwright."""
-    try:
-        from playwright.sync_api import sync_playwright
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page(viewport={"width": 1200, "height": 800})
-            page.goto(f"file://{html_path.absolute()}")
-            page.wait_for_load_state("networkidle")
-            page.screenshot(path=screenshot_path)
-            browser.close()
-        return True
-    except ImportError:
-        print("Warning: playwright not installed. Run: pip install playwright && playwright install chromium")
-        return False
-    except Exception as e:
-        print(f"Error creating screenshot for {html_path}: {e}")
-        return False
+# Split once at the data slot: the JSON is written as its own chunk and never goes through substitution.
+# The tail has no placeholders and is encoded up front.
+_TEMPLATE_HEAD, _TEMPLATE_TAIL = HTML_TEMPLATE.template.split("$DATA_JSON")
+_TEMPLATE_HEAD = PageTemplate(_TEMPLATE_HEAD)
+_TEMPLATE_TAIL = _TEMPLATE_TAIL.encode("utf-8")
+
+def _create_missing_screenshots(pending_shots):
+    for _, html_full_path, _ in pending_shots:
+        print(f"Creating screenshot for {html_full_path.name}...")
+    done = create_screenshots_batch([(html, png) for _, html, png in pending_shots])
+    for (row, _, png), ok in zip(pending_shots, done):
+        if ok:
+            _set_screenshot(row, preview_image(png).name)
+
+def _set_screenshot(row, name):
+    row["screenshot_file"] = name
+    row["screenshot_html"] = escape(name) if name else None
+
+_NUMERIC = (int, float)
+
+def _fmt(value, digits):
+    # Anything but a plain number (None, a string, a bool in a hand-edited result) shows as N/A instead of
+    # failing the whole report build
+    return f"{value:.{digits}f}" if type(value) in _NUMERIC else "N/A"
 
 def get_report_data(results_dir: Path, create_screenshots: bool = True):
     results = []
     prompt_text = ""
-    for json_file in sorted(results_dir.glob("*.json")):
-        if json_file.name == 'report.json':
-            continue
-
+    json_files, names = _scan_dir(results_dir)
+    json_files = [f for f in json_files if f.name != 'report.json']
+    _load_disk_cache(results_dir)
+    loaded, parsed_any = _load_results(json_files)
+    if parsed_any:
+        _save_disk_cache(results_dir, json_files)
+    pending_shots = []  # (row, html path, screenshot path)
+    for json_file in json_files:
         try:
-            data = json.loads(json_file.read_text())
+            data = loaded[json_file]
+            if isinstance(data, Exception):
+                raise data
             if not prompt_text:
                 prompt_text = data.get("prompt", {}).get("text", "")
 
@@ -216,20 +381,19 @@ def get_report_data(results_dir: Path, create_screenshots: bool = True):
             html_file = Path(html_file_path).name if html_file_path else None
 
             screenshot_file = None
+            missing_shot = None
             if html_file and create_screenshots:
                 html_full_path = results_dir / html_file
                 screenshot_name = html_file.replace(".html", "_screenshot.png")
                 screenshot_full_path = results_dir / screenshot_name
 
-                # Create screenshot if it doesn't exist
-                if html_full_path.exists() and not screenshot_full_path.exists():
-                    print(f"Creating screenshot for {html_file}...")
-                    if create_screenshot(html_full_path, screenshot_full_path):
-                        screenshot_file = screenshot_name
-                elif screenshot_full_path.exists():
-                    screenshot_file = screenshot_name
+                # Create screenshot if it doesn't exist (after the loop, see _create_missing_screenshots)
+                if screenshot_name in names:
+                    screenshot_file = preview_image(screenshot_full_path, names).name
+                elif html_file in names:
+                    missing_shot = (html_full_path, screenshot_full_path)
 
-            results.append({
+            row = {
                 "timestamp": data.get("timestamp"),
                 "model": data.get("model"),
                 "generation_time_seconds": data.get("generation_time_seconds"),
@@ -238,22 +402,34 @@ def get_report_data(results_dir: Path, create_screenshots: bool = True):
                 "prompt_tokens": data.get("usage", {}).get("prompt_tokens", 0),
                 "completion_tokens": data.get("usage", {}).get("completion_tokens", 0),
                 "html_file": html_file,
-                "screenshot_file": screenshot_file,
-            })
+            }
+            _set_screenshot(row, screenshot_file)
+            # Display strings are formatted once here, for the server-rendered rows and for renderTable();
+            # the raw values above stay for sorting
+            row["time_s_fmt"] = _fmt(row["generation_time_seconds"], 2)
+            row["tps_fmt"] = _fmt(row["tokens_per_second"], 2)
+            row["cost_fmt"] = _fmt(row["cost"], 4)
+            row["ts_fmt"] = escape(str(row["timestamp"])[:19].replace("T", " ")) if row["timestamp"] else "N/A"
+            # Pre-escaped text for both renderers, as build_bench_report does with its *_html fields
+            row["model_html"] = escape(str(row["model"] or "N/A"))
+            row["html_file_html"] = escape(html_file) if html_file else None
+            results.append(row)
+            if missing_shot:
+                pending_shots.append((row,) + missing_shot)
         except (json.JSONDecodeError, KeyError) as e:
             print(f"Skipping corrupted or incomplete file {json_file.name}: {e}")
 
+    if pending_shots:
+        _create_missing_screenshots(pending_shots)
+
     return {
         "prompt": prompt_text,
         "results": sorted(results, key=lambda x: x.get("timestamp") or "", reverse=True)
     }
 
-def build_html_table(results):
-    if not results:
-        return '<p class="text-center p-4">No results yet. Benchmarks may be running...</p>'
-
-    table = '<table id="data-table" class="table-auto w-full">'
-    table += """
+# Rows are rendered here so the table shows up without waiting for JS; the page only re-renders them
+# from DATA after a sort click. Both read the *_fmt strings from get_report_data.
+_TABLE_HEAD = """<table id="data-table" class="table-auto w-full">
         <thead class="bg-gray-200">
             <tr>
                 <th class="px-4 py-2" data-key="model">Model</th>
@@ -267,36 +443,139 @@ def build_html_table(results):
             </tr>
         </thead>
         <tbody>
-        </tbody>
-    """
-    table += "</table>"
-    return table
+"""
+_TABLE_TAIL = """        </tbody>
+    </table>"""
+_TD = '<td class="border px-4 py-2">'
+
+def _table_row(row):
+    html_link = (f'<a href="{row["html_file_html"]}" target="_blank" class="text-blue-600 hover:underline">View</a>'
+                 if row.get("html_file") else "N/A")
+    shot = row.get("screenshot_html")
+    screenshot_img = f'<img data-src="{shot}" class="preview-img" alt="Screenshot" loading="lazy" decoding="async">' if shot else ""
+    return "".join((
+        '            <tr class="border-t preview-container">',
+        _TD, row["model_html"], "</td>",
+        _TD, row["time_s_fmt"], "</td>",
+        _TD, row["tps_fmt"], "</td>",
+        _TD, row["cost_fmt"], "</td>",
+        _TD, str(row.get("prompt_tokens") or 0), "</td>",
+        _TD, str(row.get("completion_tokens") or 0), "</td>",
+        _TD, row["ts_fmt"], "</td>",
+        _TD, html_link, screenshot_img, "</td></tr>\n",
+    ))
+
+def build_html_table(results):
+    if not results:
+        return '<p class="text-center p-4">No results yet. Benchmarks may be running...</p>'
+    return "".join((_TABLE_HEAD, *map(_table_row, results), _TABLE_TAIL))
 
-def update_report(results_dir: Path, create_screenshots: bool = True):
+def update_report(results_dir: Path, create_screenshots: bool = True, new_record=None):
+    # new_record: optional (json_path, data) of a result that was just written
     report_dir = Path(results_dir)
     report_dir.mkdir(exist_ok=True)
+    if new_record is not None:
+        remember_result(*new_record)
 
     report_data = get_report_data(report_dir, create_screenshots=create_screenshots)
 
+    prompt = report_data.get('prompt', 'Not available.')
     table_html = build_html_table(report_data["results"])
+    data_json = json_script_bytes(report_data["results"])
+
+    # Everything the page shows except its "Last updated" time; when that is unchanged since the last
+    # write, index.html (and its timestamp) is left alone so watchers and open browsers see no change
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (prompt.encode("utf-8"), table_html.encode("utf-8"), data_json,
+                 _TEMPLATE_HEAD.template.encode("utf-8"), _TEMPLATE_TAIL):
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    content_hash = digest.hexdigest()
+    out = report_dir / "index.html"
+    hash_path = report_dir / REPORT_HASH_NAME
+    try:
+        if out.exists() and hash_path.read_text() == content_hash:
+            return
+    except OSError:
+        pass
 
-    # Convert results to JSON for JavaScript
-    data_json = json.dumps(report_data["results"])
-
-    final_html = HTML_TEMPLATE.format(
-        PROMPT=report_data.get('prompt', 'Not available.'),
+    head = _TEMPLATE_HEAD.safe_substitute(
+        PROMPT=prompt,
         TABLE_CONTENT=table_html,
-        DATA_JSON=data_json,
         TIMESTAMP=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     )
 
-    (report_dir / "index.html").write_text(final_html)
+    # Written next to the target and renamed over it: a browser or screenshot never loads a half-written file
+    tmp = report_dir / "index.html.tmp"
+    with open(tmp, "wb") as f:
+        f.write(head.encode("utf-8"))
+        f.write(data_json)
+        f.write(_TEMPLATE_TAIL)
+    os.replace(tmp, out)
+    try:
+        hash_path.write_text(content_hash)
+    except OSError:
+        pass
+
+def _results_signature(results_dir: Path):
+    # (name, mtime_ns, size) of every result file: changes exactly when a result is added or rewritten
+    sig = []
+    try:
+        with os.scandir(results_dir) as it:
+            for e in it:
+                if (e.name.endswith(".json") and e.name != "report.json" and not e.name.startswith(".")
+                        and e.is_file()):
+                    st = e.stat()
+                    sig.append((e.name, st.st_mtime_ns, st.st_size))
+    except FileNotFoundError:
+        pass
+    return frozenset(sig)
+
+def watch(results_dir: Path, create_screenshots: bool = True, interval: float = 1.0, settle: float = 0.25):
+    # Rebuild only when result files change. With watchdog installed this sleeps until the OS reports
+    # a change; otherwise it compares a cheap directory signature every `interval` seconds.
+    results_dir = Path(results_dir)
+    changed = threading.Event()
+    observer = None
+    if Observer is not None:
+        class _ResultHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                paths = (getattr(event, "src_path", ""), getattr(event, "dest_path", ""))
+                if any(str(p).endswith(".json") and not os.path.basename(p).startswith(".") for p in paths):
+                    changed.set()
+
+        observer = Observer()
+        observer.schedule(_ResultHandler(), str(results_dir))
+        observer.start()
+    print(f"Watching {results_dir} ({'file events' if observer else f'polling every {interval:g}s'}), Ctrl+C to stop.")
+    last = None
+    try:
+        while True:
+            sig = _results_signature(results_dir)
+            if sig != last:
+                update_report(results_dir, create_screenshots=create_screenshots)
+                last = sig
+                print(f"Report updated ({len(sig)} results).")
+            if observer is not None:
+                changed.wait()
+                changed.clear()
+                time.sleep(settle)  # let a burst of writes (result + html + txt) land before rebuilding
+            else:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
 
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) > 1:
         create_screenshots = "--no-screenshots" not in sys.argv
         results_path = sys.argv[1]
-        update_report(Path(results_path), create_screenshots=create_screenshots)
+        if "--watch" in sys.argv:
+            watch(Path(results_path), create_screenshots=create_screenshots)
+        else:
+            update_report(Path(results_path), create_screenshots=create_screenshots)
     else:
-        print("Usage: python openrouter_report.py <path_to_results_dir> [--no-screenshots]")
\ No newline at end of file
+        print("Usage: python openrouter_report.py <path_to_results_dir> [--no-screenshots] [--watch]")
\ No newline at end of file
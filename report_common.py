@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Helpers shared by build_bench_report.py and openrouter_report.py: JSON I/O, page templates and
+Playwright screenshots with optional Pillow thumbnails."""
+import asyncio
+import io
+import json
+import math
+import os
+import string
+from pathlib import Path
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def json_loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _finite(obj):
+    # NaN/Infinity -> None, as orjson writes them; JSON.parse rejects the bare NaN/Infinity json.dumps emits
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def json_dumps(obj) -> bytes:
+    """Compact, strictly valid JSON as UTF-8 bytes; uses orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass  # e.g. ints beyond 64 bit; let the stdlib handle it
+    try:
+        return json.dumps(obj, allow_nan=False).encode("utf-8")
+    except ValueError:
+        # only rebuild the data when it actually holds a non-finite float
+        return json.dumps(_finite(obj), allow_nan=False).encode("utf-8")
+
+
+def json_script_bytes(obj) -> bytes:
+    # Script-embeddable JSON as bytes: orjson output goes straight to the file, no decode/encode round trip.
+    # "<" only occurs inside JSON strings, so "\u003c" is always valid there and no "</script>" or "<!--"
+    # in model output can end or confuse the script element
+    return json_dumps(obj).replace(b"<", b"\\u003c")
+
+
+def read_bytes(p) -> bytes:
+    # One unbuffered read per file; skips the BufferedReader/TextIOWrapper layers of read_text()
+    fd = os.open(p, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(size, 65536))
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+
+
+class PageTemplate(string.Template):
+    # Only $UPPER_CASE names are placeholders, so CSS braces and JS ${...} need no escaping
+    idpattern = r"[A-Z][A-Z_]*"
+    flags = 0
+
+
+# Pages rendered at once in the shared browser; loads mostly wait, so a few in flight overlap well
+SCREENSHOT_CONCURRENCY = 8
+
+_AFTER_NEXT_PAINT_JS = "() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))"
+
+# Hover previews are shown at most 600x400 (.preview-img); with Pillow installed a thumbnail of that size
+# is written next to each screenshot and the page loads it instead of the full 1200x800 PNG
+THUMB_SIZE = (600, 400)
+
+
+def thumb_path(screenshot_path: Path) -> Path:
+    return screenshot_path.with_name(screenshot_path.stem + "_thumb.png")
+
+
+# Screenshots whose thumbnail could not be made, with the mtime_ns they had then: not retried on every
+# rebuild (e.g. in --watch mode) until the screenshot itself changes
+_thumb_failed = {}
+
+
+def _mtime_ns(p):
+    try:
+        return os.stat(p).st_mtime_ns
+    except OSError:
+        return None
+
+
+def make_thumbnail(screenshot_path: Path, data: bytes = None) -> bool:
+    """Write the preview thumbnail of a screenshot (from its PNG bytes if given); False without Pillow."""
+    if Image is None:
+        return False
+    try:
+        with Image.open(io.BytesIO(data) if data is not None else screenshot_path) as im:
+            im.thumbnail(THUMB_SIZE)
+            im.save(thumb_path(screenshot_path), optimize=True)
+        _thumb_failed.pop(str(screenshot_path), None)
+        return True
+    except Exception as e:
+        print(f"Error creating thumbnail for {screenshot_path}: {e}")
+        _thumb_failed[str(screenshot_path)] = _mtime_ns(screenshot_path)
+        return False
+
+
+def preview_image(screenshot_path: Path, names=None) -> Path:
+    # The thumbnail if there is one (made now for screenshots taken before Pillow was installed), else the PNG.
+    # names: the folder's file names when already listed, instead of a stat
+    thumb = thumb_path(screenshot_path)
+    if thumb.name in names if names is not None else thumb.exists():
+        return thumb
+    if Image is None:
+        return screenshot_path
+    failed = _thumb_failed.get(str(screenshot_path))
+    if failed is not None and failed == _mtime_ns(screenshot_path):
+        return screenshot_path
+    return thumb if make_thumbnail(screenshot_path) else screenshot_path
+
+
+async def _screenshots_async(jobs, async_playwright):
+    sem = asyncio.Semaphore(SCREENSHOT_CONCURRENCY)
+    async with async_playwright() as p:
+        # One browser and context for the whole batch: the launch costs more than a page render
+        browser = await p.chromium.launch()
+        context = await browser.new_context(viewport={"width": 1200, "height": 800})
+
+        async def shot(html_path, screenshot_path):
+            async with sem:
+                page = await context.new_page()
+                try:
+                    # Local file: "load" already covers its subresources. Two animation frames then let
+                    # script-generated styles (e.g. the Tailwind play CDN) apply, instead of networkidle's
+                    # fixed 500 ms quiet period per page
+                    await page.goto(f"file://{html_path.absolute()}", wait_until="load")
+                    await page.evaluate(_AFTER_NEXT_PAINT_JS)
+                    data = await page.screenshot(path=screenshot_path)
+                    if Image is not None:
+                        await asyncio.to_thread(make_thumbnail, screenshot_path, data)
+                    return True
+                except Exception as e:
+                    print(f"Error creating screenshot for {html_path}: {e}")
+                    return False
+                finally:
+                    await page.close()
+
+        try:
+            return await asyncio.gather(*(shot(html, png) for html, png in jobs))
+        finally:
+            await browser.close()
+
+
+def create_screenshots_batch(jobs):
+    """Screenshot several HTML files in one browser session; returns one success flag per (html, png) job."""
+    if not jobs:
+        return []
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError:
+        print("Warning: playwright not installed. Run: pip install playwright && playwright install chromium")
+        return [False] * len(jobs)
+    try:
+        return list(asyncio.run(_screenshots_async(jobs, async_playwright)))
+    except Exception as e:
+        print(f"Error creating screenshots: {e}")
+        return [False] * len(jobs)
+
+
+def create_screenshot(html_path: Path, screenshot_path: Path) -> bool:
+    """Create a screenshot of an HTML file using playwright."""
+    return create_screenshots_batch([(html_path, screenshot_path)])[0]
@@ -16,8 +16,40 @@ import re
 import shutil
 import subprocess
 import sys
+import threading
+from collections import deque
 
 ANSI = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+# One scanner for both reading layouts, run only on lines that passed the "ower:" prefilter:
+#   label: "CPU Power: 12.3 W" / "GPU Power: 800 mW" (block label anywhere before "Power:")
+#   avg:   "Average power: 850 mW" inside a CPU/GPU/ANE block (some OS versions)
+READING_RE = re.compile(
+    r"(?P<label>CPU|GPU|ANE)[^:]*?Power:\s*(?P<val>[\d.]+)\s*(?P<unit>m?W)"
+    r"|Average power:\s*(?P<avg>[\d.]+)\s*(?P<aunit>m?W)",
+    re.I,
+)
+DIRECT_PREFIXES = ("CPU Power:", "GPU Power:", "ANE Power:")
+
+class Acc:
+    """Running count/min/max/sum of power samples (W); O(1) memory however long powermetrics runs."""
+    __slots__ = ("n", "lo", "hi", "s")
+
+    def __init__(self):
+        self.n, self.lo, self.hi, self.s = 0, None, None, 0.0
+
+    def add(self, v):
+        if self.n:
+            if v < self.lo:
+                self.lo = v
+            elif v > self.hi:
+                self.hi = v
+        else:
+            self.lo = self.hi = v
+        self.n += 1
+        self.s += v
+
+    def __len__(self):
+        return self.n
 
 def parse_args():
     p = argparse.ArgumentParser()
@@ -33,8 +65,10 @@ def check_tools():
     if os.name == "posix" and sys.platform == "darwin" and os.geteuid() != 0:
         print("Notice: running without sudo; power readings may be unavailable.", file=sys.stderr)
 
-def detect_samplers(samples: int, interval_ms: int):
+def detect_samplers(samples: int, interval_ms: int, log=None):
     # Try a series of sampler combinations known across macOS versions.
+    # Output is parsed line by line while powermetrics runs, so nothing is buffered and
+    # the samples read so far survive an interrupted or failing run.
     combos = [
         "cpu_power,gpu_power,ane_power",
         "cpu_power,gpu_power",
@@ -49,72 +83,119 @@ def detect_samplers(samples: int, interval_ms: int):
             "powermetrics", "--samplers", combo, "-n", str(samples), "-i", str(interval_ms)
         ]
         try:
-            res = subprocess.run(cmd, check=True, capture_output=True, text=True)
-            if res.stdout.strip():
-                return combo, res.stdout
-        except subprocess.CalledProcessError as e:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+        except OSError as e:
             last_err = e
+            continue
+        # Drain stderr alongside stdout: a child that fills the stderr pipe (repeated warnings over a
+        # long -n) would otherwise block while we wait for stdout. Only the last lines are kept for errors.
+        err_tail = deque(maxlen=50)
+        err_reader = threading.Thread(target=err_tail.extend, args=(proc.stderr,), daemon=True)
+        err_reader.start()
+        got_output = False
+        def lines():
+            nonlocal got_output
+            for line in proc.stdout:
+                if log is not None:
+                    log.write(line)
+                if not got_output and line.strip():
+                    got_output = True
+                yield line
+        cpu, gpu, ane = Acc(), Acc(), Acc()
+        try:
+            parse_watts(lines(), cpu, gpu, ane)
+        except KeyboardInterrupt:
+            proc.kill()
+            proc.wait()
+            print("Interrupted, summarising the samples read so far.", file=sys.stderr)
+            return combo, (cpu, gpu, ane)
+        proc.wait()
+        err_reader.join(timeout=2)
+        err = "".join(err_tail)
+        if proc.returncode != 0:
+            last_err = subprocess.CalledProcessError(proc.returncode, cmd, stderr=err)
+            if got_output:
+                print("powermetrics failed:", last_err, file=sys.stderr)
+                return combo, (cpu, gpu, ane)
+            continue
+        if got_output:
+            return combo, (cpu, gpu, ane)
     if last_err:
         print("powermetrics failed:", last_err, file=sys.stderr)
-        if getattr(last_err, "stdout", None):
-            print(last_err.stdout or "", file=sys.stderr)
         if getattr(last_err, "stderr", None):
             print(last_err.stderr or "", file=sys.stderr)
-    return None, ""
-
-def parse_watts(log_text: str):
-    cpu, gpu, ane = [], [], []
-    for raw in log_text.splitlines():
-        s = ANSI.sub("", raw.strip())
-        # Match e.g. "CPU Power: 12.3 W" or "Average power: 800 mW" within CPU/GPU sections.
-        # Direct power lines
-        for label, arr in (("CPU", cpu), ("GPU", gpu), ("ANE", ane)):
-            m = re.search(fr"{label}.*?Power:\s*([\d.]+)\s*(m?W)", s, re.I)
-            if m:
-                val = float(m.group(1))
-                unit = m.group(2).lower()
-                arr.append(val / 1000.0 if unit == "mw" else val)
-        # Average power lines (some OS versions)
-        # Example inside a CPU/GPU block: "Average power: 850 mW"
-        m = re.search(r"^(CPU|GPU|ANE).*", s)
-        if m:
-            current = m.group(1).upper()
-        m2 = re.search(r"Average power:\s*([\d.]+)\s*(m?W)", s, re.I)
-        if m2:
-            val = float(m2.group(1))
-            unit = m2.group(2).lower()
-            watts = val / 1000.0 if unit == "mw" else val
-            if current == "CPU":
-                cpu.append(watts)
-            elif current == "GPU":
-                gpu.append(watts)
-            elif current == "ANE":
-                ane.append(watts)
+    return None, (Acc(), Acc(), Acc())
+
+def parse_watts(lines, cpu=None, gpu=None, ane=None):
+    # lines: the whole log as one string, or any iterable of lines (e.g. a pipe).
+    # Readings are added to the given accumulators, so a caller keeps them if reading stops early.
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+    cpu = Acc() if cpu is None else cpu
+    gpu = Acc() if gpu is None else gpu
+    ane = Acc() if ane is None else ane
+    by_label = {"CPU": cpu, "GPU": gpu, "ANE": ane}
+    current = None
+    for raw in lines:
+        s = raw.strip()
+        if "\x1b" in s:
+            s = ANSI.sub("", s)
+        # Remember which block we are in for the "Average power" lines
+        if s.startswith(("CPU", "GPU", "ANE")):
+            current = s[:3]
+        # Most lines carry no power reading at all: skip them before any regex runs
+        if "ower:" not in s:
+            continue
+        # Direct power lines; the plain "CPU Power: 1234 mW" layout is split by hand, the regex
+        # only handles whatever else turns up
+        if s.startswith(DIRECT_PREFIXES):
+            parts = s[10:].split()
+            if len(parts) == 2 and parts[1].lower() in ("w", "mw"):
+                try:
+                    val = float(parts[0])
+                except ValueError:
+                    pass
+                else:
+                    by_label[current].add(val / 1000.0 if parts[1].lower() == "mw" else val)
+                    continue
+        for m in READING_RE.finditer(s):
+            label = m.group("label")
+            if label:
+                val, unit = m.group("val", "unit")
+                label = label.upper()
+            elif current:
+                label, val, unit = current, m.group("avg"), m.group("aunit")
+            else:
+                continue
+            val = float(val)
+            by_label[label].add(val / 1000.0 if unit.lower() == "mw" else val)
     return cpu, gpu, ane
 
-def stats(arr):
+def stats(acc):
     return {
-        "samples": len(arr),
-        "min": min(arr) if arr else None,
-        "max": max(arr) if arr else None,
-        "avg": (sum(arr) / len(arr)) if arr else None,
+        "samples": acc.n,
+        "min": acc.lo,
+        "max": acc.hi,
+        "avg": (acc.s / acc.n) if acc.n else None,
     }
 
 def main():
     args = parse_args()
     check_tools()
-    combo, text = detect_samplers(args.samples, args.interval_ms)
-    if combo:
-        print(f"Using powermetrics samplers: {combo}")
+    log = None
     if args.log:
         try:
-            with open(args.log, "w") as f:
-                f.write(text)
-            print(f"Raw log saved to: {args.log}")
+            log = open(args.log, "w")
         except Exception as e:
             print(f"Warning: could not write log: {e}", file=sys.stderr)
-
-    cpu, gpu, ane = parse_watts(text)
+    try:
+        combo, (cpu, gpu, ane) = detect_samplers(args.samples, args.interval_ms, log=log)
+    finally:
+        if log is not None:
+            log.close()
+            print(f"Raw log saved to: {args.log}")
+    if combo:
+        print(f"Using powermetrics samplers: {combo}")
 
     print("\nPower metrics summary (W):")
     print(f" CPU: {stats(cpu)}")